@@ -1,22 +1,55 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
-import sys
-from io import StringIO
-import pyperclip
-from datetime import datetime
+import time
+import webbrowser
+from collections import deque
 from utils.paths import get_home_dir, get_app_data_dir, get_storage_path, get_db_path, get_machine_id_path, get_workspace_storage_path
 from augutils.json_modifier import modify_telemetry_ids
 from augutils.sqlite_modifier import clean_augment_data
 from augutils.workspace_cleaner import clean_workspace_storage
 try:
-    from tempmail.real_email_service import RealTempEmailService
+    from tempmail.real_email_service import RealTempEmailService as EmailService
     REAL_EMAIL_AVAILABLE = True
 except ImportError:
-    from tempmail.temp_email_service import InternxtTempEmailService
+    from tempmail.temp_email_service import InternxtTempEmailService as EmailService
     REAL_EMAIL_AVAILABLE = False
 from tempmail.verification_parser import AdvancedVerificationParser
 
+SEP = "=" * 50
+# Service-dependent UI text, resolved once at import
+REAL_TAG = "REAL " if REAL_EMAIL_AVAILABLE else ""
+LOG_MAX_LINES = 1000
+TIME_FMT = '%H:%M:%S'
+INBOX_MAX_ITEMS = 500
+TOAST_MS = 5000
+
+FONT_TITLE = ('Arial', 18, 'bold')
+FONT_CODE_LARGE = ('Arial', 16, 'bold')
+FONT_CODE = ('Arial', 14, 'bold')
+FONT_BOLD = ('Arial', 10, 'bold')
+FONT_BOLD_9 = ('Arial', 9, 'bold')
+FONT_LINK = ('Arial', 9, 'underline')
+FONT_NORMAL = ('Arial', 10)
+FONT_SMALL = ('Arial', 9)
+FONT_TINY = ('Arial', 8)
+
+# Log line templates shared by the individual and combined cleanup tasks
+TPL_STORAGE_BACKUP = "📁 Storage backup: {}".format
+TPL_MACHINE_ID_BACKUP = "📁 Machine ID backup: {}".format
+TPL_DB_BACKUP = "📁 Database backup: {}".format
+TPL_DELETED_ROWS = "🗑️ Deleted {} rows".format
+TPL_WORKSPACE_BACKUP = "📁 Workspace backup: {}".format
+TPL_DELETED_FILES = "🗑️ Deleted {} files".format
+
+PATH_ROWS = (
+    ("Home Directory:", get_home_dir),
+    ("App Data Directory:", get_app_data_dir),
+    ("Storage Path:", get_storage_path),
+    ("DB Path:", get_db_path),
+    ("Machine ID Path:", get_machine_id_path),
+    ("Workspace Storage:", get_workspace_storage_path),
+)
 
 class FreeAugmentCodeGUI:
     def __init__(self, root):
@@ -26,39 +59,57 @@ class FreeAugmentCodeGUI:
         self.root.configure(bg='#f0f0f0')
 
         # Initialize temporary email service (use real service if available)
-        if REAL_EMAIL_AVAILABLE:
-            self.temp_email_service = RealTempEmailService()
-            self.using_real_service = True
-        else:
-            self.temp_email_service = InternxtTempEmailService()
-            self.using_real_service = False
+        self.temp_email_service = EmailService()
+        self.using_real_service = REAL_EMAIL_AVAILABLE
 
         self.verification_parser = AdvancedVerificationParser()
         self.current_verification_codes = []
 
+        # Buffered output log, flushed to the text widget once per idle cycle
+        self._log_buf = deque()
+        self._log_pending = False
+
+        # Inbox rows (newest first) plus rows received but not yet rendered
+        self._inbox_new = deque()
+        self._inbox_pending = False
+        self._placeholder_present = False
+
+        # Widgets currently disabled through _set_busy
+        self._busy_widgets = set()
+
+        # Reusable non-modal notification window, created on first use
+        self._toast = None
+        self._toast_label = None
+        self._toast_hide_id = None
+
         # Setup email service callbacks
-        self.temp_email_service.add_callback('on_email_received', self.on_email_received)
-        self.temp_email_service.add_callback('on_verification_code', self.on_verification_code_found)
-        self.temp_email_service.add_callback('on_error', self.on_temp_email_error)
-        self.temp_email_service.add_callback('on_status_change', self.on_temp_email_status_change)
+        add_callback = self.temp_email_service.add_callback
+        add_callback('on_email_received', self.on_email_received)
+        add_callback('on_verification_code', self.on_verification_code_found)
+        add_callback('on_error', self.on_temp_email_error)
+        add_callback('on_status_change', self.on_temp_email_status_change)
         
+        # Named styles, registered once and shared by every widget
+        style = ttk.Style()
+        style.configure('Accent.TButton', font=FONT_BOLD)
+        style.configure('Title.TLabel', font=FONT_TITLE)
+
         # Create notebook for tabs
         notebook = ttk.Notebook(root)
         notebook.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=10, pady=10)
 
         # Configure grid weights
-        root.columnconfigure(0, weight=1)
-        root.rowconfigure(0, weight=1)
+        self._weight(root, cols=(0,), rows=(0,))
 
         # Create main cleanup tab
         cleanup_frame = ttk.Frame(notebook, padding="20")
         notebook.add(cleanup_frame, text="🧹 Cleanup Tools")
-        cleanup_frame.columnconfigure(1, weight=1)
+        self._weight(cleanup_frame, cols=(1,))
 
         # Create temporary email tab
         email_frame = ttk.Frame(notebook, padding="20")
         notebook.add(email_frame, text="📧 Temp Email")
-        email_frame.columnconfigure(1, weight=1)
+        self._weight(email_frame, cols=(1,))
 
         # Setup cleanup tab
         self.setup_cleanup_tab(cleanup_frame)
@@ -74,33 +125,35 @@ class FreeAugmentCodeGUI:
         """Setup the cleanup tools tab"""
         # Title
         title_label = ttk.Label(main_frame, text="🚀 Free AugmentCode",
-                               font=('Arial', 18, 'bold'))
+                               style='Title.TLabel')
         title_label.grid(row=0, column=0, columnspan=2, pady=(0, 20))
 
         # Description
         desc_label = ttk.Label(main_frame,
                               text="Clean AugmentCode data to login with different accounts",
-                              font=('Arial', 10))
+                              font=FONT_NORMAL)
         desc_label.grid(row=1, column=0, columnspan=2, pady=(0, 20))
         
         # System Paths Section
         paths_frame = ttk.LabelFrame(main_frame, text="📁 System Paths", padding="10")
         paths_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 20))
-        paths_frame.columnconfigure(1, weight=1)
+        self._weight(paths_frame, cols=(0,))
         
-        # Path labels
-        self.create_path_row(paths_frame, 0, "Home Directory:", get_home_dir())
-        self.create_path_row(paths_frame, 1, "App Data Directory:", get_app_data_dir())
-        self.create_path_row(paths_frame, 2, "Storage Path:", get_storage_path())
-        self.create_path_row(paths_frame, 3, "DB Path:", get_db_path())
-        self.create_path_row(paths_frame, 4, "Machine ID Path:", get_machine_id_path())
-        self.create_path_row(paths_frame, 5, "Workspace Storage:", get_workspace_storage_path())
+        # Path table, rendered into a single read-only text widget
+        paths_text = tk.Text(paths_frame, height=len(PATH_ROWS), width=80, font=FONT_TINY,
+                             relief=tk.FLAT, cursor='arrow', wrap=tk.NONE)
+        paths_text.tag_configure('label', font=FONT_BOLD_9)
+        for label, get_path in PATH_ROWS:
+            paths_text.insert(tk.END, f"{label} ", 'label')
+            paths_text.insert(tk.END, get_path() + "\n")
+        paths_text.delete('end-2c')  # Drop the trailing newline
+        paths_text.configure(state='disabled')
+        paths_text.grid(row=0, column=0, sticky=(tk.W, tk.E))
         
         # Actions Section
         actions_frame = ttk.LabelFrame(main_frame, text="⚡ Actions", padding="10")
         actions_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 20))
-        actions_frame.columnconfigure(0, weight=1)
-        actions_frame.columnconfigure(1, weight=1)
+        self._weight(actions_frame, cols=(0, 1))
         
         # Action buttons
         self.clean_button = ttk.Button(actions_frame, text="🧹 Clean All Data", 
@@ -124,12 +177,12 @@ class FreeAugmentCodeGUI:
         # Output Section
         output_frame = ttk.LabelFrame(main_frame, text="📋 Output", padding="10")
         output_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 20))
-        output_frame.columnconfigure(0, weight=1)
-        output_frame.rowconfigure(0, weight=1)
-        main_frame.rowconfigure(5, weight=1)
+        self._weight(output_frame, cols=(0,), rows=(0,))
+        self._weight(main_frame, rows=(5,))
         
         # Output text area
-        self.output_text = scrolledtext.ScrolledText(output_frame, height=15, width=80)
+        self.output_text = scrolledtext.ScrolledText(output_frame, height=15, width=80,
+                                                     undo=False, maxundo=0)
         self.output_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Clear output button
@@ -146,32 +199,27 @@ class FreeAugmentCodeGUI:
 4. Login with a new email in AugmentCode plugin"""
         
         ttk.Label(instructions_frame, text=instructions_text, 
-                 font=('Arial', 9), justify=tk.LEFT).grid(row=0, column=0, sticky=tk.W)
-        
-        # Style configuration
-        style = ttk.Style()
-        style.configure('Accent.TButton', font=('Arial', 10, 'bold'))
+                 font=FONT_SMALL, justify=tk.LEFT).grid(row=0, column=0, sticky=tk.W)
         
         # Initial message
         self.log_message("Welcome to Free AugmentCode! Ready to clean your data.")
 
     def setup_temp_email_tab(self, main_frame):
         """Setup the temporary email tab"""
-        main_frame.rowconfigure(4, weight=1)  # Make inbox area expandable
+        self._weight(main_frame, rows=(4,))  # Make inbox area expandable
 
         # Title
         title_label = ttk.Label(main_frame, text="📧 Temporary Email Manager",
-                               font=('Arial', 18, 'bold'))
+                               style='Title.TLabel')
         title_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
 
         # Email Generation Section
         gen_frame = ttk.LabelFrame(main_frame, text="🎯 Email Generation", padding="10")
         gen_frame.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 15))
-        gen_frame.columnconfigure(1, weight=1)
-        gen_frame.columnconfigure(3, weight=1)
+        self._weight(gen_frame, cols=(1, 3))
 
         # Row 0: Domain selection and Generate button
-        ttk.Label(gen_frame, text="Preferred Domain:", font=('Arial', 9, 'bold')).grid(
+        ttk.Label(gen_frame, text="Preferred Domain:", font=FONT_BOLD_9).grid(
             row=0, column=0, sticky=tk.W, padx=(0, 5), pady=5)
 
         self.domain_var = tk.StringVar(value="Auto (Best Available)")
@@ -183,8 +231,7 @@ class FreeAugmentCodeGUI:
         if REAL_EMAIL_AVAILABLE:
             try:
                 domains = self.temp_email_service.get_available_domains()
-                domain_options = ["Auto (Best Available)"] + [f"{domain}" for domain in domains]
-                self.domain_combo['values'] = domain_options
+                self.domain_combo['values'] = ("Auto (Best Available)", *domains)
             except:
                 self.domain_combo['values'] = ["Auto (Best Available)"]
         else:
@@ -202,12 +249,12 @@ class FreeAugmentCodeGUI:
         self.info_btn.grid(row=0, column=3, padx=(5, 0), pady=5)
 
         # Row 1: Email display and Copy button
-        ttk.Label(gen_frame, text="Email Address:", font=('Arial', 9, 'bold')).grid(
+        ttk.Label(gen_frame, text="Email Address:", font=FONT_BOLD_9).grid(
             row=1, column=0, sticky=tk.W, padx=(0, 5), pady=(10, 5))
 
         self.email_var = tk.StringVar(value="Click 'Generate Email' to start")
         self.email_entry = ttk.Entry(gen_frame, textvariable=self.email_var,
-                                   font=('Arial', 10), state='readonly')
+                                   font=FONT_NORMAL, state='readonly')
         self.email_entry.grid(row=1, column=1, columnspan=2, sticky=(tk.W, tk.E), padx=(0, 10), pady=(10, 5))
 
         # Copy email button
@@ -218,13 +265,13 @@ class FreeAugmentCodeGUI:
         # Row 2: Email status
         self.email_status_var = tk.StringVar(value="Ready to generate email")
         ttk.Label(gen_frame, textvariable=self.email_status_var,
-                 font=('Arial', 9), foreground='blue').grid(
+                 font=FONT_SMALL, foreground='blue').grid(
             row=2, column=0, columnspan=4, sticky=tk.W, pady=(5, 0))
 
         # Monitoring Controls Section
         monitor_frame = ttk.LabelFrame(main_frame, text="👁️ Email Monitoring", padding="10")
         monitor_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 15))
-        monitor_frame.columnconfigure(2, weight=1)
+        self._weight(monitor_frame, cols=(2,))
 
         # Monitoring buttons
         self.start_monitor_btn = ttk.Button(monitor_frame, text="▶️ Start Monitoring",
@@ -242,20 +289,20 @@ class FreeAugmentCodeGUI:
         # Monitoring status
         self.monitor_status_var = tk.StringVar(value="Monitoring stopped")
         ttk.Label(monitor_frame, textvariable=self.monitor_status_var,
-                 font=('Arial', 9)).grid(row=1, column=0, columnspan=3, sticky=tk.W, pady=(5, 0))
+                 font=FONT_SMALL).grid(row=1, column=0, columnspan=3, sticky=tk.W, pady=(5, 0))
 
         # Verification Codes Section
         codes_frame = ttk.LabelFrame(main_frame, text="🔑 Verification Codes", padding="10")
         codes_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 15))
-        codes_frame.columnconfigure(1, weight=1)
+        self._weight(codes_frame, cols=(1,))
 
         # Current verification code display
-        ttk.Label(codes_frame, text="Latest Code:", font=('Arial', 10, 'bold')).grid(
+        ttk.Label(codes_frame, text="Latest Code:", font=FONT_BOLD).grid(
             row=0, column=0, sticky=tk.W, padx=(0, 10))
 
         self.verification_code_var = tk.StringVar(value="No codes received yet")
         self.code_entry = ttk.Entry(codes_frame, textvariable=self.verification_code_var,
-                                  font=('Arial', 14, 'bold'), state='readonly',
+                                  font=FONT_CODE, state='readonly',
                                   foreground='green')
         self.code_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 10))
 
@@ -267,22 +314,20 @@ class FreeAugmentCodeGUI:
         # Code timestamp
         self.code_timestamp_var = tk.StringVar(value="")
         ttk.Label(codes_frame, textvariable=self.code_timestamp_var,
-                 font=('Arial', 8), foreground='gray').grid(
+                 font=FONT_TINY, foreground='gray').grid(
             row=1, column=0, columnspan=3, sticky=tk.W, pady=(5, 0))
 
         # Email Inbox Section
         inbox_frame = ttk.LabelFrame(main_frame, text="📬 Email Inbox", padding="10")
         inbox_frame.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 15))
-        inbox_frame.columnconfigure(0, weight=1)
-        inbox_frame.rowconfigure(0, weight=1)
+        self._weight(inbox_frame, cols=(0,), rows=(0,))
 
         # Inbox listbox with scrollbar
         inbox_container = ttk.Frame(inbox_frame)
         inbox_container.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        inbox_container.columnconfigure(0, weight=1)
-        inbox_container.rowconfigure(0, weight=1)
+        self._weight(inbox_container, cols=(0,), rows=(0,))
 
-        self.inbox_listbox = tk.Listbox(inbox_container, height=8, font=('Arial', 9))
+        self.inbox_listbox = tk.Listbox(inbox_container, height=8, font=FONT_SMALL)
         self.inbox_listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
         inbox_scrollbar = ttk.Scrollbar(inbox_container, orient=tk.VERTICAL, command=self.inbox_listbox.yview)
@@ -304,50 +349,91 @@ class FreeAugmentCodeGUI:
 6. Use the cleanup tools to reset your VS Code data for the next account"""
 
         ttk.Label(instructions_frame, text=instructions_text,
-                 font=('Arial', 9), justify=tk.LEFT).grid(row=0, column=0, sticky=tk.W)
-        
-    def create_path_row(self, parent, row, label, path):
-        """Create a row showing a path with label"""
-        ttk.Label(parent, text=label, font=('Arial', 9, 'bold')).grid(
-            row=row, column=0, sticky=tk.W, padx=(0, 10))
+                 font=FONT_SMALL, justify=tk.LEFT).grid(row=0, column=0, sticky=tk.W)
         
-        path_entry = ttk.Entry(parent, font=('Arial', 8))
-        path_entry.insert(0, path)
-        path_entry.configure(state='readonly')
-        path_entry.grid(row=row, column=1, sticky=(tk.W, tk.E), pady=1)
-        
-    def log_message(self, message):
-        """Add a message to the output text area"""
-        self.output_text.insert(tk.END, f"{message}\n")
+    @staticmethod
+    def _weight(widget, cols=(), rows=()):
+        """Give the listed grid columns/rows weight 1 in one call each"""
+        if cols:
+            widget.columnconfigure(cols, weight=1)
+        if rows:
+            widget.rowconfigure(rows, weight=1)
+
+    def log_message(self, message, *args):
+        """Queue a message for the output text area
+
+        Extra args are %-formatted into message lazily, when the batch is
+        written out on the Tk thread.
+
+        Safe to call from worker threads: the message is only buffered here
+        and the Tk thread writes it out on its next idle tick, so no redraw
+        is ever forced from outside the event loop.
+        """
+        self._log_buf.append((message, args) if args else message)
+        if not self._log_pending:
+            self._log_pending = True
+            self.root.after(0, self._flush_log)
+
+    def _flush_log(self):
+        """Write all queued log messages with a single insert"""
+        self._log_pending = False
+        batch = []
+        while self._log_buf:
+            entry = self._log_buf.popleft()
+            batch.append(entry if isinstance(entry, str) else entry[0] % entry[1])
+        if not batch:
+            return
+        self.output_text.insert(tk.END, "\n".join(batch) + "\n")
+
+        # Keep the widget bounded to the most recent LOG_MAX_LINES lines
+        line_count = int(self.output_text.index('end-1c').split('.')[0])
+        if line_count > LOG_MAX_LINES:
+            self.output_text.delete('1.0', f'{line_count - LOG_MAX_LINES}.0')
         self.output_text.see(tk.END)
-        self.root.update_idletasks()
         
     def clear_output(self):
         """Clear the output text area"""
         self.output_text.delete(1.0, tk.END)
         
-    def start_progress(self):
-        """Start the progress bar"""
-        self.progress.start(10)
+    def start_progress(self, steps=None):
+        """Start the progress bar
+
+        With a known step count the bar is determinate and only moves when
+        set_progress is called; otherwise it animates at 20 Hz.
+        """
+        if steps:
+            self.progress.configure(mode='determinate', maximum=steps, value=0)
+        else:
+            self.progress.configure(mode='indeterminate')
+            self.progress.start(50)
         self.clean_button.configure(state='disabled')
         
+    def set_progress(self, step):
+        """Advance a determinate progress bar to the given step"""
+        self.progress['value'] = step
+        
     def stop_progress(self):
         """Stop the progress bar"""
         self.progress.stop()
+        self.progress['value'] = 0
         self.clean_button.configure(state='normal')
         
-    def run_in_thread(self, func):
-        """Run a function in a separate thread"""
+    def run_in_thread(self, func, steps=None):
+        """Run a function in a separate thread
+
+        The worker never touches Tk directly; widget updates are marshalled
+        back to the Tk thread with root.after.
+        """
         def wrapper():
             try:
-                self.start_progress()
                 func()
             except Exception as e:
                 self.log_message(f"❌ Error: {str(e)}")
-                messagebox.showerror("Error", f"An error occurred: {str(e)}")
+                self.root.after(0, messagebox.showerror, "Error", f"An error occurred: {str(e)}")
             finally:
-                self.stop_progress()
+                self.root.after(0, self.stop_progress)
         
+        self.start_progress(steps)
         thread = threading.Thread(target=wrapper)
         thread.daemon = True
         thread.start()
@@ -358,12 +444,13 @@ class FreeAugmentCodeGUI:
             self.log_message("🔄 Modifying Telemetry IDs...")
             try:
                 result = modify_telemetry_ids()
-                self.log_message("✅ Telemetry IDs modified successfully!")
-                self.log_message(f"📁 Storage backup: {result['storage_backup_path']}")
+                parts = ["✅ Telemetry IDs modified successfully!"]
+                parts.append(TPL_STORAGE_BACKUP(result['storage_backup_path']))
                 if result['machine_id_backup_path']:
-                    self.log_message(f"📁 Machine ID backup: {result['machine_id_backup_path']}")
-                self.log_message(f"🔑 New Machine ID: {result['new_machine_id'][:16]}...")
-                self.log_message(f"🔑 New Device ID: {result['new_device_id']}")
+                    parts.append(TPL_MACHINE_ID_BACKUP(result['machine_id_backup_path']))
+                parts.append(f"🔑 New Machine ID: {result['new_machine_id'][:16]}...")
+                parts.append(f"🔑 New Device ID: {result['new_device_id']}")
+                self.log_message("\n".join(parts))
             except FileNotFoundError as e:
                 self.log_message(f"❌ File not found: {e}")
                 
@@ -375,9 +462,10 @@ class FreeAugmentCodeGUI:
             self.log_message("🗃️ Cleaning SQLite Database...")
             try:
                 db_result = clean_augment_data()
-                self.log_message("✅ Database cleaned successfully!")
-                self.log_message(f"📁 Database backup: {db_result['db_backup_path']}")
-                self.log_message(f"🗑️ Deleted {db_result['deleted_rows']} rows")
+                parts = ["✅ Database cleaned successfully!"]
+                parts.append(TPL_DB_BACKUP(db_result['db_backup_path']))
+                parts.append(TPL_DELETED_ROWS(db_result['deleted_rows']))
+                self.log_message("\n".join(parts))
             except FileNotFoundError as e:
                 self.log_message(f"❌ Database file not found: {e}")
                 
@@ -389,9 +477,10 @@ class FreeAugmentCodeGUI:
             self.log_message("💾 Cleaning Workspace Storage...")
             try:
                 ws_result = clean_workspace_storage()
-                self.log_message("✅ Workspace storage cleaned successfully!")
-                self.log_message(f"📁 Workspace backup: {ws_result['backup_path']}")
-                self.log_message(f"🗑️ Deleted {ws_result['deleted_files_count']} files")
+                parts = ["✅ Workspace storage cleaned successfully!"]
+                parts.append(TPL_WORKSPACE_BACKUP(ws_result['backup_path']))
+                parts.append(TPL_DELETED_FILES(ws_result['deleted_files_count']))
+                self.log_message("\n".join(parts))
             except FileNotFoundError as e:
                 self.log_message(f"❌ Workspace storage not found: {e}")
                 
@@ -400,114 +489,125 @@ class FreeAugmentCodeGUI:
     def clean_all_data(self):
         """Clean all data - main function"""
         def task():
-            self.log_message("🚀 Starting complete cleanup process...")
-            self.log_message("=" * 50)
+            self.log_message("\n".join(["🚀 Starting complete cleanup process...", SEP]))
             
             try:
                 # Step 1: Modify Telemetry IDs
                 self.log_message("🔄 Step 1: Modifying Telemetry IDs...")
                 result = modify_telemetry_ids()
-                self.log_message("✅ Telemetry IDs modified!")
-                self.log_message(f"📁 Storage backup: {result['storage_backup_path']}")
+                parts = ["✅ Telemetry IDs modified!"]
+                parts.append(TPL_STORAGE_BACKUP(result['storage_backup_path']))
                 if result['machine_id_backup_path']:
-                    self.log_message(f"📁 Machine ID backup: {result['machine_id_backup_path']}")
+                    parts.append(TPL_MACHINE_ID_BACKUP(result['machine_id_backup_path']))
+                self.log_message("\n".join(parts))
+                self.root.after(0, self.set_progress, 1)
                 
                 # Step 2: Clean Database
                 self.log_message("\n🗃️ Step 2: Cleaning SQLite Database...")
                 db_result = clean_augment_data()
-                self.log_message("✅ Database cleaned!")
-                self.log_message(f"📁 Database backup: {db_result['db_backup_path']}")
-                self.log_message(f"🗑️ Deleted {db_result['deleted_rows']} rows")
+                parts = ["✅ Database cleaned!"]
+                parts.append(TPL_DB_BACKUP(db_result['db_backup_path']))
+                parts.append(TPL_DELETED_ROWS(db_result['deleted_rows']))
+                self.log_message("\n".join(parts))
+                self.root.after(0, self.set_progress, 2)
                 
                 # Step 3: Clean Workspace
                 self.log_message("\n💾 Step 3: Cleaning Workspace Storage...")
                 ws_result = clean_workspace_storage()
-                self.log_message("✅ Workspace storage cleaned!")
-                self.log_message(f"📁 Workspace backup: {ws_result['backup_path']}")
-                self.log_message(f"🗑️ Deleted {ws_result['deleted_files_count']} files")
-                
-                self.log_message("\n" + "=" * 50)
-                self.log_message("🎉 All cleanup tasks completed successfully!")
-                self.log_message("📝 You can now restart VS Code and login with a new email.")
+                parts = ["✅ Workspace storage cleaned!"]
+                parts.append(TPL_WORKSPACE_BACKUP(ws_result['backup_path']))
+                parts.append(TPL_DELETED_FILES(ws_result['deleted_files_count']))
+                parts.append("")
+                parts.append(SEP)
+                parts.append("🎉 All cleanup tasks completed successfully!")
+                parts.append("📝 You can now restart VS Code and login with a new email.")
+                self.log_message("\n".join(parts))
+                self.root.after(0, self.set_progress, 3)
                 
-                messagebox.showinfo("Success", "All cleanup tasks completed successfully!\n\nYou can now restart VS Code and login with a new email.")
+                self.root.after(0, messagebox.showinfo, "Success", "All cleanup tasks completed successfully!\n\nYou can now restart VS Code and login with a new email.")
                 
             except FileNotFoundError as e:
                 self.log_message(f"❌ Error: {e}")
-                messagebox.showerror("Error", f"File not found: {e}")
+                self.root.after(0, messagebox.showerror, "Error", f"File not found: {e}")
             except Exception as e:
                 self.log_message(f"❌ Unexpected error: {e}")
-                messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+                self.root.after(0, messagebox.showerror, "Error", f"An unexpected error occurred: {e}")
                 
-        self.run_in_thread(task)
+        self.run_in_thread(task, steps=3)
 
     # Temporary Email Methods
     def generate_temp_email(self):
         """Generate a new temporary email address"""
+        self.email_status_var.set(f"Generating {REAL_TAG}email...")
+        self._set_busy(self.generate_email_btn, True)
+
+        # Get preferred domain from selection
+        preferred_domain = None
+        domain_selection = self.domain_var.get()
+        if domain_selection != "Auto (Best Available)":
+            preferred_domain = domain_selection
+
         def task():
-            self.email_status_var.set("Generating REAL email...")
-            self.generate_email_btn.configure(state='disabled')
-
-            # Get preferred domain from selection
-            preferred_domain = None
-            domain_selection = self.domain_var.get()
-            if domain_selection != "Auto (Best Available)" and self.using_real_service:
-                preferred_domain = domain_selection
-
-            if self.using_real_service:
-                if preferred_domain:
-                    success, message, session = self.temp_email_service.generate_email_with_domain(preferred_domain)
-                else:
-                    success, message, session = self.temp_email_service.generate_real_email()
-            else:
-                success, message, session = self.temp_email_service.generate_temp_email()
+            success, message, session = self.temp_email_service.generate(preferred_domain)
+            self.root.after(0, self._apply_email_result, success, message, session)
 
-            if success and session:
-                self.email_var.set(session.email_address)
+        self.run_in_thread(task)
 
-                if self.using_real_service:
-                    service_info = f" (via {session.service_name})" if hasattr(session, 'service_name') else ""
-                    domain_info = f", domain: {session.domain}" if hasattr(session, 'domain') else ""
-                    self.email_status_var.set(f"✅ REAL email generated{service_info}{domain_info}! Expires: {session.expires_at.strftime('%H:%M:%S')}")
-                    self.log_message(f"✅ Generated REAL temporary email: {session.email_address}{service_info}{domain_info}")
+    def _apply_email_result(self, success, message, session):
+        """Apply the result of email generation to the UI (Tk thread only)"""
+        if success and session:
+            self.email_var.set(session.email_address)
 
-                    # Show service statistics
-                    if hasattr(self.temp_email_service, 'get_service_stats'):
-                        stats = self.temp_email_service.get_service_stats()
-                        self.log_message(f"📊 Available: {stats['total_services']} services, {stats['total_domains']} domains")
-                else:
-                    self.email_status_var.set(f"Email generated! Expires: {session.expires_at.strftime('%H:%M:%S')}")
-                    self.log_message(f"✅ Generated temporary email: {session.email_address}")
-
-                # Enable buttons
-                self.copy_email_btn.configure(state='normal')
-                self.start_monitor_btn.configure(state='normal')
-                self.check_now_btn.configure(state='normal')
-
-                # Clear previous inbox
-                self.inbox_listbox.delete(0, tk.END)
-                if self.using_real_service:
-                    self.inbox_listbox.insert(0, "📧 REAL inbox ready - waiting for emails...")
-                else:
-                    self.inbox_listbox.insert(0, "📧 Inbox ready - waiting for emails...")
+            service_info = f" (via {session.service_name})" if hasattr(session, 'service_name') else ""
+            domain = getattr(session, 'domain', None)
+            domain_info = f", domain: {domain}" if domain else ""
+            self.email_status_var.set(f"✅ {REAL_TAG}email generated{service_info}{domain_info}! Expires: {session.expires_at.strftime('%H:%M:%S')}")
+            parts = [f"✅ Generated {REAL_TAG}temporary email: {session.email_address}{service_info}{domain_info}"]
 
-            else:
-                self.email_status_var.set(f"Error: {message}")
-                self.log_message(f"❌ Failed to generate email: {message}")
+            # Show service statistics
+            if hasattr(self.temp_email_service, 'get_service_stats'):
+                stats = self.temp_email_service.get_service_stats()
+                parts.append(f"📊 Available: {stats['total_services']} services, {stats['total_domains']} domains")
+            self.log_message("\n".join(parts))
 
-            self.generate_email_btn.configure(state='disabled')
+            # Enable buttons
+            self.copy_email_btn.configure(state='normal')
+            self.start_monitor_btn.configure(state='normal')
+            self.check_now_btn.configure(state='normal')
 
-            # Re-enable after a short delay to prevent spam clicking
-            self.root.after(2000, lambda: self.generate_email_btn.configure(state='normal'))
+            # Clear previous inbox
+            self.inbox_listbox.delete(0, tk.END)
+            self.inbox_listbox.insert(0, f"📧 {REAL_TAG}Inbox ready - waiting for emails...")
+            self._placeholder_present = True
 
-        self.run_in_thread(task)
+        else:
+            self.email_status_var.set(f"Error: {message}")
+            self.log_message(f"❌ Failed to generate email: {message}")
+
+        # Re-enable after a short delay to prevent spam clicking
+        self.root.after(2000, self._set_busy, self.generate_email_btn, False)
+
+    def _set_busy(self, widget, busy):
+        """Disable or re-enable a widget, skipping no-op state changes"""
+        if (widget in self._busy_widgets) == busy:
+            return
+        if busy:
+            self._busy_widgets.add(widget)
+        else:
+            self._busy_widgets.discard(widget)
+        widget.configure(state='disabled' if busy else 'normal')
+
+    def _copy_to_clipboard(self, text):
+        """Copy text using Tk's in-process clipboard"""
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
 
     def copy_email_address(self):
         """Copy the temporary email address to clipboard"""
         try:
             email = self.email_var.get()
             if email and email != "Click 'Generate Temp Email' to start":
-                pyperclip.copy(email)
+                self._copy_to_clipboard(email)
                 self.email_status_var.set("📋 Email address copied to clipboard!")
                 self.log_message(f"📋 Copied email to clipboard: {email}")
 
@@ -518,18 +618,12 @@ class FreeAugmentCodeGUI:
 
     def start_email_monitoring(self):
         """Start monitoring the temporary email inbox"""
-        if self.using_real_service:
-            success = self.temp_email_service.start_real_monitoring(poll_interval=10)  # Faster for real emails
-        else:
-            success = self.temp_email_service.start_monitoring(poll_interval=15)
+        poll_interval = EmailService.DEFAULT_POLL_INTERVAL
+        success = self.temp_email_service.start_monitoring(poll_interval=poll_interval)
 
         if success:
-            if self.using_real_service:
-                self.monitor_status_var.set("🟢 REAL monitoring active - checking every 10 seconds")
-                self.log_message("👁️ Started REAL email monitoring")
-            else:
-                self.monitor_status_var.set("🟢 Monitoring active - checking every 15 seconds")
-                self.log_message("👁️ Started email monitoring")
+            self.monitor_status_var.set(f"🟢 {REAL_TAG}Monitoring active - checking every {poll_interval} seconds")
+            self.log_message(f"👁️ Started {REAL_TAG}email monitoring")
 
             self.start_monitor_btn.configure(state='disabled')
             self.stop_monitor_btn.configure(state='normal')
@@ -538,10 +632,7 @@ class FreeAugmentCodeGUI:
 
     def stop_email_monitoring(self):
         """Stop monitoring the temporary email inbox"""
-        if self.using_real_service:
-            self.temp_email_service.stop_real_monitoring()
-        else:
-            self.temp_email_service.stop_monitoring()
+        self.temp_email_service.stop_monitoring()
 
         self.monitor_status_var.set("🔴 Monitoring stopped")
         self.start_monitor_btn.configure(state='normal')
@@ -551,17 +642,11 @@ class FreeAugmentCodeGUI:
     def check_inbox_now(self):
         """Manually check inbox for new messages"""
         def task():
-            if self.using_real_service:
-                success, message, new_messages = self.temp_email_service.check_real_inbox_manually()
-            else:
-                success, message, new_messages = self.temp_email_service.check_inbox_manually()
+            success, message, new_messages = self.temp_email_service.check_now()
 
             if success:
                 if new_messages:
-                    if self.using_real_service:
-                        self.log_message(f"📬 Found {len(new_messages)} new REAL message(s)")
-                    else:
-                        self.log_message(f"📬 Found {len(new_messages)} new message(s)")
+                    self.log_message(f"📬 Found {len(new_messages)} new {REAL_TAG}message(s)")
                 else:
                     self.log_message("📭 No new messages found")
             else:
@@ -574,13 +659,13 @@ class FreeAugmentCodeGUI:
         try:
             code = self.verification_code_var.get()
             if code and code != "No codes received yet":
-                pyperclip.copy(code)
+                self._copy_to_clipboard(code)
                 self.code_timestamp_var.set("📋 Code copied to clipboard!")
                 self.log_message(f"📋 Copied verification code: {code}")
 
                 # Reset timestamp after 3 seconds
                 self.root.after(3000, lambda: self.code_timestamp_var.set(
-                    f"Received: {datetime.now().strftime('%H:%M:%S')}"))
+                    f"Received: {time.strftime(TIME_FMT)}"))
         except Exception as e:
             messagebox.showerror("Copy Error", f"Failed to copy code: {str(e)}")
 
@@ -607,24 +692,24 @@ class FreeAugmentCodeGUI:
         details_frame = ttk.Frame(detail_window, padding="10")
         details_frame.pack(fill=tk.BOTH, expand=True)
 
-        ttk.Label(details_frame, text=f"From: {message.sender}", font=('Arial', 10, 'bold')).pack(anchor=tk.W)
-        ttk.Label(details_frame, text=f"Subject: {message.subject}", font=('Arial', 10, 'bold')).pack(anchor=tk.W)
+        ttk.Label(details_frame, text=f"From: {message.sender}", font=FONT_BOLD).pack(anchor=tk.W)
+        ttk.Label(details_frame, text=f"Subject: {message.subject}", font=FONT_BOLD).pack(anchor=tk.W)
         ttk.Label(details_frame, text=f"Time: {message.timestamp.strftime('%Y-%m-%d %H:%M:%S')}",
-                 font=('Arial', 9)).pack(anchor=tk.W, pady=(0, 10))
+                 font=FONT_SMALL).pack(anchor=tk.W, pady=(0, 10))
 
         if message.verification_code:
             code_frame = ttk.LabelFrame(details_frame, text="🔑 Verification Code", padding="5")
             code_frame.pack(fill=tk.X, pady=(0, 10))
 
             code_label = ttk.Label(code_frame, text=message.verification_code,
-                                 font=('Arial', 16, 'bold'), foreground='green')
+                                 font=FONT_CODE_LARGE, foreground='green')
             code_label.pack(side=tk.LEFT)
 
             ttk.Button(code_frame, text="📋 Copy",
-                      command=lambda: pyperclip.copy(message.verification_code)).pack(side=tk.RIGHT)
+                      command=lambda: self._copy_to_clipboard(message.verification_code)).pack(side=tk.RIGHT)
 
         # Email content
-        ttk.Label(details_frame, text="Content:", font=('Arial', 10, 'bold')).pack(anchor=tk.W)
+        ttk.Label(details_frame, text="Content:", font=FONT_BOLD).pack(anchor=tk.W)
 
         content_text = scrolledtext.ScrolledText(details_frame, height=15, wrap=tk.WORD)
         content_text.pack(fill=tk.BOTH, expand=True)
@@ -634,41 +719,81 @@ class FreeAugmentCodeGUI:
     # Email Service Callbacks
     def on_email_received(self, message):
         """Callback when a new email is received"""
-        def update_ui():
-            # Add to inbox listbox
-            display_text = f"📧 {message.sender}: {message.subject} ({message.timestamp.strftime('%H:%M:%S')})"
-            self.inbox_listbox.insert(0, display_text)
-
-            # Remove "waiting for emails" message if present
-            if self.inbox_listbox.size() > 1:
-                last_item = self.inbox_listbox.get(self.inbox_listbox.size() - 1)
-                if "waiting for emails" in last_item:
-                    self.inbox_listbox.delete(self.inbox_listbox.size() - 1)
-
-            # Log the email
-            self.log_message(f"📬 New email from {message.sender}: {message.subject}")
-
-            # Analyze for verification codes
-            analysis = self.verification_parser.analyze_email_for_codes(message.content, message.sender)
-            if analysis['has_verification_code']:
-                self.log_message(f"🔍 Found verification code with {analysis['best_confidence']:.0%} confidence")
-
-        # Update UI in main thread
-        self.root.after(0, update_ui)
+        display_text = f"📧 {message.sender}: {message.subject} ({message.timestamp.strftime('%H:%M:%S')})"
+        self._inbox_new.append(display_text)
+        if not self._inbox_pending:
+            self._inbox_pending = True
+            # Update UI in main thread
+            self.root.after(50, self._flush_inbox)
+
+        # Log the email
+        self.log_message("📬 New email from %s: %s", message.sender, message.subject)
+
+        # Analyze for verification codes
+        analysis = self.verification_parser.summarize(message.content, message.sender)
+        if analysis['has_verification_code']:
+            self.log_message("🔍 Found verification code with %.0f%% confidence", analysis['best_confidence'] * 100)
+
+    def _flush_inbox(self):
+        """Insert all buffered inbox rows at the top of the listbox in one call"""
+        self._inbox_pending = False
+        new = []
+        while self._inbox_new:
+            new.append(self._inbox_new.popleft())
+        if not new:
+            return
+        if self._placeholder_present:
+            # First real email: drop the "waiting for emails" placeholder
+            self.inbox_listbox.delete(tk.END)
+            self._placeholder_present = False
+        # Newest first
+        self.inbox_listbox.insert(0, *reversed(new))
+        if self.inbox_listbox.size() > INBOX_MAX_ITEMS:
+            self.inbox_listbox.delete(INBOX_MAX_ITEMS, tk.END)
 
     def on_verification_code_found(self, code, message):
         """Callback when a verification code is found"""
-        def update_ui():
-            self.verification_code_var.set(code)
-            self.code_timestamp_var.set(f"Received: {datetime.now().strftime('%H:%M:%S')}")
-            self.copy_code_btn.configure(state='normal')
-
-            # Show notification
-            self.log_message(f"🎉 Verification code received: {code}")
-            messagebox.showinfo("Verification Code",
-                              f"New verification code received!\n\nCode: {code}\n\nFrom: {message.sender}")
-
-        self.root.after(0, update_ui)
+        ts_str = f"Received: {time.strftime(TIME_FMT)}"
+        self.root.after(0, self._apply_code, code, ts_str, message.sender)
+
+    def _apply_code(self, code, ts_str, sender):
+        """Show a newly received verification code (Tk thread only)"""
+        self.verification_code_var.set(code)
+        self.code_timestamp_var.set(ts_str)
+        self.copy_code_btn.configure(state='normal')
+
+        # Show notification
+        self.log_message(f"🎉 Verification code received: {code}")
+        self._show_toast(f"New verification code: {code}\nFrom: {sender}")
+
+    def _show_toast(self, text):
+        """Show a non-modal notification near the bottom-right of the window"""
+        if self._toast is None:
+            self._toast = tk.Toplevel(self.root)
+            self._toast.overrideredirect(True)
+            self._toast.attributes('-topmost', True)
+            self._toast_label = tk.Label(self._toast, font=FONT_BOLD, bg='#fff3cd',
+                                         padx=12, pady=8, relief='solid', borderwidth=1,
+                                         justify='left')
+            self._toast_label.pack()
+            self._toast_label.bind('<Button-1>', lambda e: self._hide_toast())
+        elif self._toast_hide_id is not None:
+            self.root.after_cancel(self._toast_hide_id)
+
+        self._toast_label.configure(text=text)
+        self._toast.update_idletasks()
+        x = self.root.winfo_rootx() + self.root.winfo_width() - self._toast.winfo_reqwidth() - 20
+        y = self.root.winfo_rooty() + self.root.winfo_height() - self._toast.winfo_reqheight() - 20
+        self._toast.geometry(f"+{max(x, 0)}+{max(y, 0)}")
+        self._toast.deiconify()
+        self._toast_hide_id = self.root.after(TOAST_MS, self._hide_toast)
+
+    def _hide_toast(self):
+        """Hide the notification window, keeping it for the next code"""
+        if self._toast_hide_id is not None:
+            self.root.after_cancel(self._toast_hide_id)
+            self._toast_hide_id = None
+        self._toast.withdraw()
 
     def on_temp_email_error(self, error_message):
         """Callback when an error occurs in the email service"""
@@ -696,11 +821,17 @@ class FreeAugmentCodeGUI:
 
         # Title
         ttk.Label(main_frame, text="📊 Available Email Services & Domains",
-                 font=('Arial', 14, 'bold')).pack(pady=(0, 15))
+                 font=FONT_CODE).pack(pady=(0, 15))
 
         if self.using_real_service and hasattr(self.temp_email_service, 'get_service_stats'):
             try:
                 stats = self.temp_email_service.get_service_stats()
+                rows = [
+                    (service['name'], ', '.join(service['domains']),
+                     service['reliability'].title(), service['description'])
+                    for service in stats['services']
+                ]
+                domains_text = ', '.join(stats['available_domains'])
 
                 # Summary
                 summary_frame = ttk.LabelFrame(main_frame, text="📈 Summary", padding="10")
@@ -710,7 +841,7 @@ class FreeAugmentCodeGUI:
 Total Domains: {stats['total_domains']}
 High Reliability Services: {stats['high_reliability_services']}"""
 
-                ttk.Label(summary_frame, text=summary_text, font=('Arial', 10)).pack(anchor=tk.W)
+                ttk.Label(summary_frame, text=summary_text, font=FONT_NORMAL).pack(anchor=tk.W)
 
                 # Services details
                 services_frame = ttk.LabelFrame(main_frame, text="🌐 Available Services", padding="10")
@@ -732,15 +863,9 @@ High Reliability Services: {stats['high_reliability_services']}"""
                 tree.column('Reliability', width=80)
                 tree.column('Description', width=250)
 
-                # Add services data
-                for service in stats['services']:
-                    domains_str = ', '.join(service['domains'])
-                    tree.insert('', tk.END, values=(
-                        service['name'],
-                        domains_str,
-                        service['reliability'].title(),
-                        service['description']
-                    ))
+                # Add services data (the tree is not mapped yet, so no per-row relayout)
+                for values in rows:
+                    tree.insert('', tk.END, values=values)
 
                 tree.pack(fill=tk.BOTH, expand=True)
 
@@ -753,8 +878,7 @@ High Reliability Services: {stats['high_reliability_services']}"""
                 domains_frame = ttk.LabelFrame(main_frame, text="📧 Available Domains", padding="10")
                 domains_frame.pack(fill=tk.X)
 
-                domains_text = ', '.join(stats['available_domains'])
-                ttk.Label(domains_frame, text=domains_text, font=('Arial', 9),
+                ttk.Label(domains_frame, text=domains_text, font=FONT_SMALL,
                          wraplength=650).pack(anchor=tk.W)
 
             except Exception as e:
@@ -762,19 +886,17 @@ High Reliability Services: {stats['high_reliability_services']}"""
                          foreground='red').pack(pady=20)
         else:
             ttk.Label(main_frame, text="Service information not available.\nReal email service may not be loaded.",
-                     font=('Arial', 10)).pack(pady=20)
+                     font=FONT_NORMAL).pack(pady=20)
 
         # Close button
         ttk.Button(main_frame, text="Close", command=info_window.destroy).pack(pady=(15, 0))
 
     def setup_footer(self):
         """Setup footer with developer information"""
-        import webbrowser
-
         # Create footer frame at the bottom of the main window
         footer_frame = ttk.Frame(self.root)
         footer_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), padx=10, pady=(0, 5))
-        footer_frame.columnconfigure(0, weight=1)
+        self._weight(footer_frame, cols=(0,))
 
         # Developer info with clickable link
         footer_text = "Developed by "
@@ -786,11 +908,11 @@ High Reliability Services: {stats['high_reliability_services']}"""
 
         # Add the "Developed by" text
         ttk.Label(content_frame, text=footer_text,
-                 font=('Arial', 9), foreground='gray').pack(side=tk.LEFT)
+                 font=FONT_SMALL, foreground='gray').pack(side=tk.LEFT)
 
         # Add clickable developer name
         dev_label = ttk.Label(content_frame, text=dev_name,
-                             font=('Arial', 9, 'underline'),
+                             font=FONT_LINK,
                              foreground='blue', cursor='hand2')
         dev_label.pack(side=tk.LEFT)
 
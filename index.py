@@ -5,20 +5,32 @@ from augutils.json_modifier import modify_telemetry_ids
 from augutils.sqlite_modifier import clean_augment_data
 from augutils.workspace_cleaner import clean_workspace_storage
 
+_BANNER = "🚀 Free AugmentCode - Console Mode\n" + "=" * 50
+_USAGE = """🚀 Free AugmentCode
+Usage:
+  python index.py          # Auto-detect best interface
+  python index.py --gui    # Force GUI mode
+  python index.py --console # Force console mode
+  python index.py --help   # Show this help
+Set FREE_AUGMENT_FORCE_CONSOLE=1 to skip GUI auto-detection"""
+
 
 def run_console_mode():
     """Run the original console-based interface"""
-    print("🚀 Free AugmentCode - Console Mode")
-    print("=" * 50)
-    print("System Paths:")
-    print(f"Home Directory: {get_home_dir()}")
-    print(f"App Data Directory: {get_app_data_dir()}")
-    print(f"Storage Path: {get_storage_path()}")
-    print(f"DB Path: {get_db_path()}")
-    print(f"Machine ID Path: {get_machine_id_path()}")
-    print(f"Workspace Storage Path: {get_workspace_storage_path()}")
-
-    print("\nModifying Telemetry IDs:")
+    # Static banner goes out in a single write instead of one print per line
+    lines = [
+        _BANNER,
+        "System Paths:",
+        f"Home Directory: {get_home_dir()}",
+        f"App Data Directory: {get_app_data_dir()}",
+        f"Storage Path: {get_storage_path()}",
+        f"DB Path: {get_db_path()}",
+        f"Machine ID Path: {get_machine_id_path()}",
+        f"Workspace Storage Path: {get_workspace_storage_path()}",
+        "",
+        "Modifying Telemetry IDs:",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
     try:
         result = modify_telemetry_ids()
         print("\nBackup created at:")
@@ -50,6 +62,16 @@ def run_console_mode():
         print(f"❌ Error: {e}")
 
 
+def console_only_reason():
+    """Return why a GUI can't be used without loading Tk, or None to probe"""
+    if os.environ.get('FREE_AUGMENT_FORCE_CONSOLE', '').strip().lower() in ('1', 'true', 'yes'):
+        return "FREE_AUGMENT_FORCE_CONSOLE is set"
+    if sys.platform.startswith('linux') and not (
+            os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')):
+        return "no DISPLAY or WAYLAND_DISPLAY"
+    return None
+
+
 def run_gui_mode():
     """Run the GUI interface"""
     try:
@@ -80,15 +102,14 @@ if __name__ == "__main__":
         elif sys.argv[1] in ['--gui', '-g']:
             run_gui_mode()
         elif sys.argv[1] in ['--help', '-h']:
-            print("🚀 Free AugmentCode")
-            print("Usage:")
-            print("  python index.py          # Auto-detect best interface")
-            print("  python index.py --gui    # Force GUI mode")
-            print("  python index.py --console # Force console mode")
-            print("  python index.py --help   # Show this help")
+            print(_USAGE)
         else:
             print(f"❌ Unknown argument: {sys.argv[1]}")
             print("Use --help for usage information")
+    elif (reason := console_only_reason()):
+        # Skip loading Tcl/Tk entirely when a GUI can't be shown
+        print(f"📟 GUI not available ({reason}) - starting console mode...")
+        run_console_mode()
     else:
         # Auto-detect: try GUI first, fall back to console
         try:
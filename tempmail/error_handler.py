@@ -3,10 +3,16 @@ Error handling and resilience utilities for temporary email services
 """
 
 import time
+import asyncio
+import inspect
 import logging
-from typing import Callable, Any, Optional
+from operator import itemgetter
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Any, Dict, Optional, Tuple
 from functools import wraps
 import requests
+from requests.adapters import HTTPAdapter
 
 
 class EmailServiceError(Exception):
@@ -32,6 +38,9 @@ class SessionExpiredError(EmailServiceError):
 class RetryHandler:
     """Handles retry logic with exponential backoff"""
     
+    # Transient failures worth retrying; anything else fails fast
+    RETRYABLE = (requests.RequestException, TimeoutError, ConnectionError, ServiceUnavailableError)
+    
     def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0):
         self.max_retries = max_retries
         self.base_delay = base_delay
@@ -44,37 +53,64 @@ class RetryHandler:
         for attempt in range(self.max_retries + 1):
             try:
                 return func(*args, **kwargs)
-            except requests.RequestException as e:
-                last_exception = NetworkError(f"Network error: {str(e)}")
+            except self.RETRYABLE as e:
+                last_exception = self._wrap(e)
                 if attempt == self.max_retries:
                     break
                 
                 # Calculate delay with exponential backoff
                 delay = min(self.base_delay * (2 ** attempt), self.max_delay)
                 time.sleep(delay)
-            except Exception as e:
-                last_exception = EmailServiceError(f"Service error: {str(e)}")
-                if attempt == self.max_retries:
-                    break
-                
-                delay = min(self.base_delay * (2 ** attempt), self.max_delay)
-                time.sleep(delay)
         
         raise last_exception
+    
+    async def aretry_with_backoff(self, coro_func: Callable, *args, **kwargs) -> Any:
+        """Await a coroutine function with retry and exponential backoff
+        
+        Same policy as retry_with_backoff, but waits with asyncio.sleep so
+        other tasks on the event loop keep running between attempts.
+        """
+        last_exception = None
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await coro_func(*args, **kwargs)
+            except self.RETRYABLE as e:
+                last_exception = self._wrap(e)
+            
+            if attempt == self.max_retries:
+                break
+            
+            delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+            await asyncio.sleep(delay)
+        
+        raise last_exception
+    
+    @staticmethod
+    def _wrap(error: Exception) -> EmailServiceError:
+        """Map a retryable exception onto the email service error hierarchy"""
+        if isinstance(error, EmailServiceError):
+            return error
+        return NetworkError(f"Network error: {str(error)}")
 
 
 def with_error_handling(retry_count: int = 3):
     """Decorator for adding error handling to methods"""
+    # RetryHandler holds only configuration, so one instance serves every call
+    retry_handler = RetryHandler(max_retries=retry_count)
+    
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await retry_handler.aretry_with_backoff(func, *args, **kwargs)
+            return async_wrapper
+        
+        # Retryable failures surface as EmailServiceError (via RetryHandler._wrap);
+        # anything else is a bug in func and propagates unchanged
         @wraps(func)
         def wrapper(*args, **kwargs):
-            retry_handler = RetryHandler(max_retries=retry_count)
-            try:
-                return retry_handler.retry_with_backoff(func, *args, **kwargs)
-            except EmailServiceError:
-                raise
-            except Exception as e:
-                raise EmailServiceError(f"Unexpected error in {func.__name__}: {str(e)}")
+            return retry_handler.retry_with_backoff(func, *args, **kwargs)
         return wrapper
     return decorator
 
@@ -83,29 +119,32 @@ class ServiceHealthChecker:
     """Monitors service health and availability"""
     
     def __init__(self):
-        self.last_check = 0
         self.check_interval = 300  # 5 minutes
-        self.service_status = {}
+        # url -> (is_healthy, expires_at)
+        self.service_status: Dict[str, Tuple[bool, float]] = {}
+        # Reuse TCP/TLS connections across probes
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=0)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
     
     def is_service_healthy(self, service_url: str) -> bool:
         """Check if a service is healthy"""
         current_time = time.time()
         
-        # Use cached result if recent
-        if (service_url in self.service_status and 
-            current_time - self.last_check < self.check_interval):
-            return self.service_status[service_url]
+        # Use cached result if still fresh for this URL
+        entry = self.service_status.get(service_url)
+        if entry and current_time < entry[1]:
+            return entry[0]
         
         try:
-            response = requests.head(service_url, timeout=10)
+            response = self._session.head(service_url, timeout=10, allow_redirects=False)
             is_healthy = response.status_code < 500
-            self.service_status[service_url] = is_healthy
-            self.last_check = current_time
-            return is_healthy
         except requests.RequestException:
-            self.service_status[service_url] = False
-            self.last_check = current_time
-            return False
+            is_healthy = False
+        
+        self.service_status[service_url] = (is_healthy, current_time + self.check_interval)
+        return is_healthy
 
 
 class FallbackManager:
@@ -129,18 +168,29 @@ class FallbackManager:
                 'priority': 3
             }
         ]
+        # Priorities are static, so sort once into a read-only tuple
+        self._services_by_priority = tuple(
+            MappingProxyType(service)
+            for service in sorted(self.fallback_services, key=itemgetter('priority'))
+        )
         self.health_checker = ServiceHealthChecker()
     
-    def get_available_service(self) -> Optional[dict]:
+    def get_available_service(self) -> Optional[MappingProxyType]:
         """Get the best available fallback service"""
-        # Sort by priority
-        sorted_services = sorted(self.fallback_services, key=lambda x: x['priority'])
-        
-        for service in sorted_services:
-            if self.health_checker.is_service_healthy(service['url']):
-                return service
-        
-        return None
+        # Probe every service concurrently, then take results in priority order
+        # so a slow primary no longer delays probing the fallbacks.
+        executor = ThreadPoolExecutor(max_workers=len(self._services_by_priority))
+        try:
+            futures = [
+                (service, executor.submit(self.health_checker.is_service_healthy, service['url']))
+                for service in self._services_by_priority
+            ]
+            for service, future in futures:
+                if future.result():
+                    return service
+            return None
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
 
 # Setup logging for the email service
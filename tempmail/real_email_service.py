@@ -3,12 +3,18 @@ REAL Temporary Email Service Implementation
 Uses actual temporary email providers to generate real, functional email addresses
 """
 
+import re
+import html
 import time
 import threading
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple, Any
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # Import the temp-mails library for real email services
 try:
@@ -21,8 +27,94 @@ except ImportError:
     TEMP_MAILS_AVAILABLE = False
     print("⚠️ temp-mails library not available. Install with: pip install temp-mails")
 
+# BeautifulSoup is optional; fall back to tag stripping without it
+try:
+    from bs4 import BeautifulSoup
+    _HAS_BS4 = True
+except ImportError:
+    _HAS_BS4 = False
+
+# Cheap check for markup worth converting, and the fallback tag stripper
+_HTML_SNIFF = re.compile(r'<(?:html|div|p|br|span|body)\b', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Message body keys in lookup order, with whether each holds HTML (None: sniff it)
+_CONTENT_KEYS = (('html', True), ('content', None), ('body', None), ('text', False))
+
+# Priority patterns - most specific first
+_PRIORITY_PATTERNS = (
+    # HTML patterns (for emails with HTML formatting) - more flexible
+    r'your verification code is[:\s]*<[^>]*>([A-Z0-9]{4,8})<',  # "Your verification code is: <b>066533</b>"
+    r'verification code is[:\s]*<[^>]*>([A-Z0-9]{4,8})<',       # "verification code is: <b>066533</b>"
+    r'code is[:\s]*<[^>]*>([A-Z0-9]{4,8})<',                   # "code is: <b>066533</b>"
+
+    # Nested HTML patterns (for complex HTML structures)
+    r'code[:\s]*<[^>]*><[^>]*>([A-Z0-9]{4,8})<',               # "Code: <span><b>XY123Z</b></span>"
+    r'verification[:\s]*<[^>]*><[^>]*>([A-Z0-9]{4,8})<',       # Nested verification patterns
+
+    # Exact "Your verification code is:" patterns (highest priority)
+    r'your verification code is[:\s]+([A-Z0-9]{4,8})',
+    r'verification code is[:\s]+([A-Z0-9]{4,8})',
+    r'your code is[:\s]+([A-Z0-9]{4,8})',
+
+    # Common verification patterns
+    r'verification code[:\s]+([A-Z0-9]{4,8})',
+    r'your verification code[:\s]+([A-Z0-9]{4,8})',
+    r'your code[:\s]+([A-Z0-9]{4,8})',
+    r'enter code[:\s]+([A-Z0-9]{4,8})',
+    r'use code[:\s]+([A-Z0-9]{4,8})',
+    r'confirm.*?code[:\s]+([A-Z0-9]{4,8})',
+
+    # Service-specific patterns
+    r'augmentcode.*?code[:\s]+([A-Z0-9]{4,8})',
+    r'github.*?code[:\s]+([A-Z0-9]{4,8})',
+
+    # Generic code patterns (lower priority to avoid false positives)
+    r'([A-Z0-9]{4}-[A-Z0-9]{4})',  # Hyphenated codes
+)
+
+# Fallback patterns for standalone numbers
+_FALLBACK_PATTERNS = (
+    r'([0-9]{6})',      # 6-digit numbers (most common)
+    r'([0-9]{4,8})',    # 4-8 digit numbers
+    r'([A-Z0-9]{4,8})', # 4-8 alphanumeric
+)
+
+# Compiled once at import; the extractor runs on every fetched message
+_PRIORITY_RES = tuple(re.compile(p, re.IGNORECASE) for p in _PRIORITY_PATTERNS)
+_FALLBACK_RES = tuple(re.compile(p, re.IGNORECASE) for p in _FALLBACK_PATTERNS)
+
+# Substrings at least one of which every keyword-bearing pattern contains
+_PREFILTER_KEYWORDS = ('verif', 'code', 'confirm', 'authenticate')
+
+# Sort rank for service reliability levels (unknown levels sort last)
+_RELIABILITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+
+def _temp_mails_fields(email_data: Dict, default_id: Any) -> Tuple[str, str, str]:
+    """Entry fields for temp-mails providers, which all normalize to these keys"""
+    return str(email_data['id']), email_data.get('from', 'Unknown'), email_data.get('subject', 'No Subject')
+
+
+def _generic_fields(email_data: Dict, default_id: Any) -> Tuple[str, str, str]:
+    """Entry fields for providers of unknown format (format varies by service)"""
+    message_id = email_data.get('id')
+    if message_id is None:
+        message_id = email_data.get('mail_id', default_id)
+    sender = email_data.get('from')
+    if sender is None:
+        sender = email_data.get('sender', 'Unknown')
+    return str(message_id), sender, email_data.get('subject', 'No Subject')
 
-@dataclass
+
+# (message_id, sender, subject) parser per service name
+_FIELD_PARSERS = dict.fromkeys(
+    ('Mail.tm', 'TempMail.lol', '10MinuteMail', 'DropMail', 'YopMail', 'Mailinator', 'EmailOnDeck'),
+    _temp_mails_fields
+)
+
+
+@dataclass(slots=True)
 class RealEmailMessage:
     """Represents a real email message from temporary email services"""
     sender: str
@@ -33,7 +125,7 @@ class RealEmailMessage:
     verification_code: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RealEmailSession:
     """Represents a real temporary email session"""
     email_address: str
@@ -43,15 +135,69 @@ class RealEmailSession:
     expires_at: datetime
     messages: List[RealEmailMessage]
     is_active: bool = True
+    seen_ids: Set[str] = field(default_factory=set)  # message_ids already in messages
+    domain: Optional[str] = None
+    service_info: Optional['ServiceInfo'] = None
+
+
+@dataclass(slots=True, frozen=True)
+class ServiceInfo:
+    """A supported temporary email provider"""
+    name: str
+    cls: type
+    typical_domains: Tuple[str, ...]
+    reliability: str
+    description: str
+
+
+# Available services with their typical domains (in order of preference)
+_AVAILABLE_SERVICES: Tuple[ServiceInfo, ...] = (
+    ServiceInfo('Mail.tm', Mail_tm, ('punkproof.com',), 'high',
+                'Reliable service with consistent domains'),
+    ServiceInfo('TempMail.lol', Tempmail_lol, ('jailbreakeverything.com',), 'high',
+                'Fast service with unique domains'),
+    ServiceInfo('10MinuteMail', Tenminemail_com, ('hosliy.com',), 'medium',
+                '10-minute expiry service'),
+    ServiceInfo('DropMail', Dropmail_me, ('dropmail.me',), 'medium',
+                'Simple temporary email service'),
+    ServiceInfo('YopMail', Yopmail_com, ('cobal.infos.st',), 'medium',
+                'European temporary email service'),
+    ServiceInfo('Mailinator', Mailinator_com, ('mailinator.com',), 'high',
+                'Well-known temporary email service'),
+    ServiceInfo('EmailOnDeck', Emailondeck_com, ('blouseness.com',), 'medium',
+                'Alternative temporary email provider'),
+) if TEMP_MAILS_AVAILABLE else ()
 
 
 class RealTempEmailService:
     """Real temporary email service using actual providers"""
     
+    DEFAULT_POLL_INTERVAL = 10  # Faster for real emails
+    GENERATE_CONCURRENCY = 3  # Providers tried at once when generating
+    GENERATE_TIMEOUT = 30  # Seconds to wait on in-flight providers before moving on
+    MONITOR_MAX_BACKOFF = 300  # Cap in seconds for the monitor's error backoff
+    FETCH_CACHE_TTL = 1.0  # Seconds an inbox fetch result is shared with later callers
+    # Numeric codes too common to be real (leading zeros already stripped)
+    _BLACKLIST_CODES = frozenset({
+        '', '1234', '9999', '1111', '2222', '3333', '4444', '5555', '6666', '7777', '8888'
+    })
+    
     def __init__(self):
         self.current_session: Optional[RealEmailSession] = None
         self.monitoring_thread: Optional[threading.Thread] = None
         self.monitoring_active = False
+        # Set by stop_real_monitoring to cut the monitor's sleep short
+        self._stop_event = threading.Event()
+        # Serializes seen_ids updates and collapses concurrent inbox fetches
+        self._deliver_lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._fetch_in_flight: Optional[Future] = None
+        self._last_fetch_session: Optional[RealEmailSession] = None
+        self._last_fetch_result: List[RealEmailMessage] = []
+        self._last_fetch_at = 0.0
+        # Callbacks run on one pool thread, in trigger order, so slow handlers
+        # never hold up the monitor
+        self._callback_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='realmail-cb')
         self.callbacks = {
             'on_email_received': [],
             'on_verification_code': [],
@@ -60,57 +206,15 @@ class RealTempEmailService:
         }
         
         # Available services with their typical domains (in order of preference)
-        self.available_services = [
-            {
-                'name': 'Mail.tm',
-                'class': Mail_tm,
-                'typical_domains': ['punkproof.com'],
-                'reliability': 'high',
-                'description': 'Reliable service with consistent domains'
-            },
-            {
-                'name': 'TempMail.lol',
-                'class': Tempmail_lol,
-                'typical_domains': ['jailbreakeverything.com'],
-                'reliability': 'high',
-                'description': 'Fast service with unique domains'
-            },
-            {
-                'name': '10MinuteMail',
-                'class': Tenminemail_com,
-                'typical_domains': ['hosliy.com'],
-                'reliability': 'medium',
-                'description': '10-minute expiry service'
-            },
-            {
-                'name': 'DropMail',
-                'class': Dropmail_me,
-                'typical_domains': ['dropmail.me'],
-                'reliability': 'medium',
-                'description': 'Simple temporary email service'
-            },
-            {
-                'name': 'YopMail',
-                'class': Yopmail_com,
-                'typical_domains': ['cobal.infos.st'],
-                'reliability': 'medium',
-                'description': 'European temporary email service'
-            },
-            {
-                'name': 'Mailinator',
-                'class': Mailinator_com,
-                'typical_domains': ['mailinator.com'],
-                'reliability': 'high',
-                'description': 'Well-known temporary email service'
-            },
-            {
-                'name': 'EmailOnDeck',
-                'class': Emailondeck_com,
-                'typical_domains': ['blouseness.com'],
-                'reliability': 'medium',
-                'description': 'Alternative temporary email provider'
-            }
-        ]
+        self.available_services = _AVAILABLE_SERVICES
+        
+        # The service table is fixed, so derive the lookups from it once
+        self._available_domains = tuple(dict.fromkeys(
+            domain for service in self.available_services for domain in service.typical_domains
+        ))
+        self._services_by_reliability = tuple(sorted(
+            self.available_services, key=lambda x: _RELIABILITY_RANK.get(x.reliability, 2)
+        ))
         
         self.logger = logging.getLogger(__name__)
     
@@ -120,12 +224,16 @@ class RealTempEmailService:
             self.callbacks[event_type].append(callback)
     
     def _trigger_callback(self, event_type: str, *args, **kwargs):
-        """Trigger callbacks for an event"""
+        """Queue callbacks for an event on the callback thread"""
         for callback in self.callbacks.get(event_type, []):
-            try:
-                callback(*args, **kwargs)
-            except Exception as e:
-                self.logger.error(f"Callback error: {e}")
+            self._callback_pool.submit(self._run_callback, callback, args, kwargs)
+    
+    def _run_callback(self, callback, args: tuple, kwargs: dict):
+        """Run one callback, logging instead of raising on failure"""
+        try:
+            callback(*args, **kwargs)
+        except Exception as e:
+            self.logger.error('Callback error: %s', e)
     
     def generate_real_email(self, preferred_domain: str = None) -> Tuple[bool, str, Optional[RealEmailSession]]:
         """
@@ -142,80 +250,161 @@ class RealTempEmailService:
         # Sort services by preference (preferred domain first, then by reliability)
         sorted_services = self._sort_services_by_preference(preferred_domain)
 
-        # Try each service until one works
-        for service_info in sorted_services:
-            service_name = service_info['name']
-            service_class = service_info['class']
-            typical_domains = service_info['typical_domains']
-
-            try:
-                self._trigger_callback('on_status_change', f'Trying {service_name} (domains: {", ".join(typical_domains)})...')
-
-                # Create service instance
-                service_instance = service_class()
-
-                # Get the real email address
-                email_address = service_instance.email
-
-                if email_address and '@' in email_address:
-                    domain = email_address.split('@')[1]
-
-                    # Create enhanced session with domain info
-                    now = datetime.now()
-                    expires_at = now + timedelta(hours=1)  # Most services expire in 1 hour
-
-                    self.current_session = RealEmailSession(
-                        email_address=email_address,
-                        service_name=service_name,
-                        service_instance=service_instance,
-                        created_at=now,
-                        expires_at=expires_at,
-                        messages=[],
-                        is_active=True
-                    )
-
-                    # Add domain and service info to session
-                    self.current_session.domain = domain
-                    self.current_session.service_info = service_info
-
-                    success_msg = f"✅ Generated REAL email: {email_address} (via {service_name}, domain: {domain})"
-                    self._trigger_callback('on_status_change', success_msg)
-                    return True, success_msg, self.current_session
-
-            except Exception as e:
-                self.logger.warning(f"Failed to use {service_name}: {str(e)}")
-                self._trigger_callback('on_status_change', f'❌ {service_name} failed: {str(e)}')
-                continue
+        # A preferred-domain service gets a solo attempt before fanning out
+        if preferred_domain and preferred_domain in sorted_services[0].typical_domains:
+            result = self._try_services_concurrently(sorted_services[:1])
+            if result is None:
+                result = self._try_services_concurrently(sorted_services[1:])
+        else:
+            result = self._try_services_concurrently(sorted_services)
+
+        if result is not None:
+            service_info, service_instance, email_address = result
+            service_name = service_info.name
+            domain = email_address.split('@')[1]
+
+            # Create enhanced session with domain info
+            now = datetime.now()
+            expires_at = now + timedelta(hours=1)  # Most services expire in 1 hour
+
+            self.current_session = RealEmailSession(
+                email_address=email_address,
+                service_name=service_name,
+                service_instance=service_instance,
+                created_at=now,
+                expires_at=expires_at,
+                messages=[],
+                is_active=True,
+                domain=domain,
+                service_info=service_info
+            )
+
+            success_msg = f"✅ Generated REAL email: {email_address} (via {service_name}, domain: {domain})"
+            self._trigger_callback('on_status_change', success_msg)
+            return True, success_msg, self.current_session
 
         # If all services failed
         error_msg = "❌ All temporary email services failed. Please try again later."
         self._trigger_callback('on_error', error_msg)
         return False, error_msg, None
 
-    def _sort_services_by_preference(self, preferred_domain: str = None) -> List[Dict]:
-        """Sort services by preference (preferred domain first, then reliability)"""
-        services = self.available_services.copy()
-
-        if preferred_domain:
-            # Move services with preferred domain to front
-            preferred_services = []
-            other_services = []
-
-            for service in services:
-                if preferred_domain in service['typical_domains']:
-                    preferred_services.append(service)
-                else:
-                    other_services.append(service)
-
-            # Sort by reliability within each group
-            preferred_services.sort(key=lambda x: {'high': 0, 'medium': 1, 'low': 2}.get(x['reliability'], 2))
-            other_services.sort(key=lambda x: {'high': 0, 'medium': 1, 'low': 2}.get(x['reliability'], 2))
+    @classmethod
+    def _create_service(cls, service_class) -> Tuple[Any, Optional[str]]:
+        """Instantiate a provider and read its address (runs in a worker thread)"""
+        service_instance = service_class()
+        cls._tune_http_session(service_instance)
+        return service_instance, service_instance.email
+
+    @staticmethod
+    def _tune_http_session(service_instance):
+        """Give a provider's own requests.Session a pooled adapter that retries transient failures"""
+        session = getattr(service_instance, '_session', None)
+        if not isinstance(session, requests.Session):
+            return
+        # Sessions carry per-provider auth headers and cookies, so each keeps its
+        # own; only stock adapters are swapped, leaving custom TLS adapters alone
+        for prefix, adapter in list(session.adapters.items()):
+            if type(adapter) is HTTPAdapter:
+                session.mount(prefix, HTTPAdapter(
+                    pool_connections=4, pool_maxsize=4,
+                    max_retries=Retry(total=2, backoff_factor=0.3,
+                                      status_forcelist=(502, 503, 504))
+                ))
+
+    def _try_services_concurrently(self, services: List[ServiceInfo]) -> Optional[Tuple[ServiceInfo, Any, str]]:
+        """
+        Start up to GENERATE_CONCURRENCY providers at once, topping up as attempts fail
+        Each attempt gets GENERATE_TIMEOUT seconds from when it starts.
+        Returns: (service_info, service_instance, email_address) of the first success, or None
+        """
+        if not services:
+            return None
 
-            return preferred_services + other_services
-        else:
+        queue = list(reversed(services))
+        # future -> (service_info, deadline), in submission order
+        pending = {}
+        try:
+            while queue or pending:
+                while queue and len(pending) < self.GENERATE_CONCURRENCY:
+                    service_info = queue.pop()
+                    self._trigger_callback('on_status_change', f'Trying {service_info.name} (domains: {", ".join(service_info.typical_domains)})...')
+                    future = self._start_attempt(service_info.cls)
+                    pending[future] = (service_info, time.monotonic() + self.GENERATE_TIMEOUT)
+
+                next_deadline = min(deadline for _, deadline in pending.values())
+                done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                               return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+
+                # pending keeps submission order, so provider order breaks ties
+                for future in list(pending):
+                    service_info, deadline = pending[future]
+                    if future not in done:
+                        if deadline <= now:
+                            # Give up on a hung provider; it no longer counts
+                            # toward GENERATE_CONCURRENCY
+                            del pending[future]
+                            future.add_done_callback(self._discard_created_service)
+                            self.logger.warning('Timed out waiting for %s', service_info.name)
+                            self._trigger_callback('on_status_change', f'❌ {service_info.name} timed out')
+                        continue
+                    del pending[future]
+                    try:
+                        service_instance, email_address = future.result()
+                    except Exception as e:
+                        self.logger.warning('Failed to use %s: %s', service_info.name, e)
+                        self._trigger_callback('on_status_change', f'❌ {service_info.name} failed: {str(e)}')
+                        continue
+                    if email_address and '@' in email_address:
+                        return service_info, service_instance, email_address
+                    self._close_service_session(service_instance)
+            return None
+        finally:
+            # Losers may already have created addresses; those are abandoned at
+            # the provider, but their connections are closed once they finish
+            for future in pending:
+                future.add_done_callback(self._discard_created_service)
+
+    def _start_attempt(self, service_class) -> Future:
+        """Run one provider attempt on its own thread, so hung attempts never hold up the next"""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='realmail-gen')
+        try:
+            return executor.submit(self._create_service, service_class)
+        finally:
+            executor.shutdown(wait=False)
+
+    @classmethod
+    def _discard_created_service(cls, future: Future):
+        """Done-callback for provider attempts whose result is no longer wanted"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        service_instance, _ = future.result()
+        cls._close_service_session(service_instance)
+
+    @staticmethod
+    def _close_service_session(service_instance):
+        """Release a provider's pooled keep-alive connections"""
+        session = getattr(service_instance, '_session', None)
+        if isinstance(session, requests.Session):
+            session.close()
+
+    def _sort_services_by_preference(self, preferred_domain: str = None) -> List[ServiceInfo]:
+        """Sort services by preference (preferred domain first, then reliability)"""
+        if not preferred_domain:
             # Sort by reliability only
-            services.sort(key=lambda x: {'high': 0, 'medium': 1, 'low': 2}.get(x['reliability'], 2))
-            return services
+            return list(self._services_by_reliability)
+
+        # Move services with preferred domain to front; the pre-sorted order
+        # keeps reliability ordering within each group
+        preferred_services = []
+        other_services = []
+        for service in self._services_by_reliability:
+            if preferred_domain in service.typical_domains:
+                preferred_services.append(service)
+            else:
+                other_services.append(service)
+
+        return preferred_services + other_services
     
     def start_real_monitoring(self, poll_interval: int = 10) -> bool:
         """
@@ -231,6 +420,7 @@ class RealTempEmailService:
             return True
         
         self.monitoring_active = True
+        self._stop_event.clear()
         self.monitoring_thread = threading.Thread(
             target=self._monitor_real_inbox,
             args=(poll_interval,),
@@ -244,12 +434,18 @@ class RealTempEmailService:
     def stop_real_monitoring(self):
         """Stop monitoring the real email inbox"""
         self.monitoring_active = False
+        self._stop_event.set()
         if self.monitoring_thread:
             self.monitoring_thread.join(timeout=2)
         self._trigger_callback('on_status_change', '🔴 Stopped real email monitoring')
     
     def _monitor_real_inbox(self, poll_interval: int):
         """Monitor real inbox for new emails (runs in separate thread)"""
+        # get_inbox() plus seen_ids is the source of truth: a provider's
+        # wait_for_new_email returns one message past a moving baseline, so mail
+        # already present or arriving between calls would never be delivered.
+        error_delay = poll_interval * 2
+        
         while self.monitoring_active and self.current_session and self.current_session.is_active:
             try:
                 # Check if session expired
@@ -259,25 +455,79 @@ class RealTempEmailService:
                     break
                 
                 # Check for new real emails
-                new_messages = self._fetch_real_messages()
-                
-                for message in new_messages:
-                    # Avoid duplicates
-                    if not any(m.message_id == message.message_id for m in self.current_session.messages):
-                        self.current_session.messages.append(message)
-                        self._trigger_callback('on_email_received', message)
-                        
-                        # Check for verification codes
-                        if message.verification_code:
-                            self._trigger_callback('on_verification_code', message.verification_code, message)
+                self._deliver_new_messages(self._fetch_real_messages())
+                if self._stop_event.wait(poll_interval):
+                    break
                 
-                time.sleep(poll_interval)
+                error_delay = poll_interval * 2
                 
             except Exception as e:
                 self._trigger_callback('on_error', f"Real monitoring error: {str(e)}")
-                time.sleep(poll_interval * 2)  # Wait longer on error
+                if self._stop_event.wait(error_delay):  # Back off further on repeated errors
+                    break
+                error_delay = min(error_delay * 2, self.MONITOR_MAX_BACKOFF)
+    
+    def _deliver_new_messages(self, messages: List[RealEmailMessage]) -> List[RealEmailMessage]:
+        """Add unseen messages to the session and fire callbacks; returns the new ones"""
+        session = self.current_session
+        seen_ids = session.seen_ids
+        new_messages = []
+        # The monitor and a manual check may deliver the same collapsed batch
+        with self._deliver_lock:
+            for message in messages:
+                # Avoid duplicates
+                if message.message_id in seen_ids:
+                    continue
+                seen_ids.add(message.message_id)
+                session.messages.append(message)
+                new_messages.append(message)
+                self._trigger_callback('on_email_received', message)
+                
+                # Check for verification codes
+                if message.verification_code:
+                    self._trigger_callback('on_verification_code', message.verification_code, message)
+        
+        return new_messages
     
     def _fetch_real_messages(self) -> List[RealEmailMessage]:
+        """
+        Fetch messages from the REAL inbox, collapsing concurrent requests
+        Callers arriving while a fetch is running share its result, and a
+        result younger than FETCH_CACHE_TTL is reused without a new request.
+        """
+        with self._fetch_lock:
+            session = self.current_session
+            if (self._last_fetch_session is session
+                    and time.monotonic() - self._last_fetch_at < self.FETCH_CACHE_TTL):
+                return list(self._last_fetch_result)
+            future = self._fetch_in_flight
+            if future is None:
+                future = self._fetch_in_flight = Future()
+                is_leader = True
+            else:
+                is_leader = False
+        
+        if not is_leader:
+            return list(future.result())
+        
+        try:
+            messages = self._fetch_inbox_messages()
+        except BaseException as e:
+            # Hand the failure to followers too, so none of them waits forever
+            future.set_exception(e)
+            raise
+        else:
+            with self._fetch_lock:
+                self._last_fetch_session = session
+                self._last_fetch_result = messages
+                self._last_fetch_at = time.monotonic()
+        finally:
+            with self._fetch_lock:
+                self._fetch_in_flight = None
+        future.set_result(messages)
+        return list(messages)
+    
+    def _fetch_inbox_messages(self) -> List[RealEmailMessage]:
         """Fetch new messages from the REAL inbox"""
         if not self.current_session or not self.current_session.service_instance:
             return []
@@ -291,55 +541,19 @@ class RealTempEmailService:
             if not inbox:
                 return []
             
+            seen_ids = self.current_session.seen_ids
+            parse_fields = _FIELD_PARSERS.get(self.current_session.service_name, _generic_fields)
+            now = datetime.now()  # One receive time for the whole poll
             messages = []
-            for email_data in inbox:
+            for index, email_data in enumerate(inbox):
                 try:
-                    # Extract email information (format varies by service)
-                    message_id = str(email_data.get('id', email_data.get('mail_id', len(messages))))
-                    sender = email_data.get('from', email_data.get('sender', 'Unknown'))
-                    subject = email_data.get('subject', 'No Subject')
-                    
-                    # Get email content
-                    content = ""
-                    try:
-                        if hasattr(service, 'get_mail_content'):
-                            # Use correct parameter name: mail_id (not message_id)
-                            content_data = service.get_mail_content(mail_id=message_id)
-                            if isinstance(content_data, dict):
-                                content = content_data.get('content', content_data.get('body', str(content_data)))
-                            else:
-                                content = str(content_data)
-                        else:
-                            content = email_data.get('content', email_data.get('body', str(email_data)))
-
-                        # Convert HTML to plain text if needed
-                        content = self._html_to_text(content)
-
-                    except Exception as e:
-                        # If content extraction fails, try to get it from email_data directly
-                        content = email_data.get('content', email_data.get('body', email_data.get('text', str(email_data))))
-                        if content:
-                            content = self._html_to_text(content)
-                        if not content or len(content) < 10:
-                            content = f"Content extraction failed: {str(e)}"
-                    
-                    # Extract verification code
-                    verification_code = self._extract_verification_code(content)
-                    
-                    # Create message
-                    message = RealEmailMessage(
-                        sender=sender,
-                        subject=subject,
-                        content=content,
-                        timestamp=datetime.now(),
-                        message_id=message_id,
-                        verification_code=verification_code
-                    )
-                    
-                    messages.append(message)
-                    
+                    message_id, sender, subject = parse_fields(email_data, index)
+                    # Messages already delivered need no second content fetch
+                    if message_id in seen_ids:
+                        continue
+                    messages.append(self._build_message(service, email_data, message_id, sender, subject, now))
                 except Exception as e:
-                    self.logger.warning(f"Error processing email: {str(e)}")
+                    self.logger.warning('Error processing email: %s', e)
                     continue
             
             return messages
@@ -348,6 +562,74 @@ class RealTempEmailService:
             self._trigger_callback('on_error', f"Error fetching real messages: {str(e)}")
             return []
     
+    def _extract_content(self, service, email_data: Dict, message_id: str) -> Tuple[str, bool]:
+        """
+        Get a message body, fetching it from the provider when supported
+        Returns: (content, is_html)
+        """
+        if hasattr(service, 'get_mail_content'):
+            # Use correct parameter name: mail_id (not message_id)
+            content_data = service.get_mail_content(mail_id=message_id)
+            if isinstance(content_data, dict):
+                return self._content_from_dict(content_data)
+            content = str(content_data) if content_data is not None else ""
+            return content, bool(_HTML_SNIFF.search(content))
+        return self._content_from_dict(email_data)
+    
+    @staticmethod
+    def _content_from_dict(data: Dict) -> Tuple[str, bool]:
+        """
+        Pick the body out of a provider's message dict
+        Returns: (content, is_html); HTML-ness is sniffed unless the key says
+        """
+        for key, is_html in _CONTENT_KEYS:
+            value = data.get(key)
+            if value:
+                content = str(value)
+                if is_html is None:
+                    is_html = bool(_HTML_SNIFF.search(content))
+                return content, is_html
+        return "", False
+    
+    def _message_fields(self, email_data: Dict, default_id: Any = 'new') -> Tuple[str, str, str]:
+        """Get (message_id, sender, subject) using the current provider's entry format"""
+        parse_fields = _FIELD_PARSERS.get(self.current_session.service_name, _generic_fields)
+        return parse_fields(email_data, default_id)
+    
+    def _parse_email_data(self, service, email_data: Dict, default_id: Any = 'new') -> RealEmailMessage:
+        """Build a RealEmailMessage from one provider inbox entry, fetching its content"""
+        return self._build_message(service, email_data, *self._message_fields(email_data, default_id))
+    
+    def _build_message(self, service, email_data: Dict, message_id: str, sender: str,
+                       subject: str, received_at: Optional[datetime] = None) -> RealEmailMessage:
+        """Fetch an entry's content and wrap it in a RealEmailMessage"""
+        # Get email content
+        try:
+            content, is_html = self._extract_content(service, email_data, message_id)
+        except Exception as e:
+            # If content extraction fails, try to get it from email_data directly
+            content, is_html = self._content_from_dict(email_data)
+            if is_html:
+                content = self._html_to_text(content)
+            if not content or len(content) < 10:
+                content = f"Content extraction failed: {str(e)}"
+        else:
+            # Convert HTML to plain text if needed
+            if is_html:
+                content = self._html_to_text(content)
+        
+        # Extract verification code
+        verification_code = self._extract_verification_code(content, is_html=False)
+        
+        return RealEmailMessage(
+            sender=sender,
+            subject=subject,
+            content=content,
+            timestamp=received_at or datetime.now(),
+            message_id=message_id,
+            verification_code=verification_code
+        )
+    
     def check_real_inbox_manually(self) -> Tuple[bool, str, List[RealEmailMessage]]:
         """Manually check REAL inbox for new messages"""
         if not self.current_session:
@@ -358,15 +640,8 @@ class RealTempEmailService:
             new_messages = self._fetch_real_messages()
             
             # Add new messages to session
-            for message in new_messages:
-                if not any(m.message_id == message.message_id for m in self.current_session.messages):
-                    self.current_session.messages.append(message)
-                    self._trigger_callback('on_email_received', message)
-                    
-                    if message.verification_code:
-                        self._trigger_callback('on_verification_code', message.verification_code, message)
-            
-            count = len([m for m in new_messages if not any(existing.message_id == m.message_id for existing in self.current_session.messages[:-len(new_messages)])])
+            new_messages = self._deliver_new_messages(new_messages)
+            count = len(new_messages)
             status_msg = f"📬 Found {count} new real message{'s' if count != 1 else ''}"
             self._trigger_callback('on_status_change', status_msg)
             
@@ -377,64 +652,38 @@ class RealTempEmailService:
             self._trigger_callback('on_error', error_msg)
             return False, error_msg, []
     
-    def _extract_verification_code(self, email_content: str) -> Optional[str]:
-        """Extract verification code from real email content with enhanced patterns"""
-        import re
-
+    def _extract_verification_code(self, email_content: str, is_html: bool = False) -> Optional[str]:
+        """
+        Extract verification code from real email content with enhanced patterns
+        Args:
+            email_content: Message body
+            is_html: True if the body is raw HTML; callers that already ran
+                _html_to_text pass False so it is scanned only once
+        """
         if not email_content:
             return None
 
         # Clean the content for better matching
         content = email_content.strip()
-
-        # Priority patterns - most specific first
-        priority_patterns = [
-            # HTML patterns (for emails with HTML formatting) - more flexible
-            r'your verification code is[:\s]*<[^>]*>([A-Z0-9]{4,8})<',  # "Your verification code is: <b>066533</b>"
-            r'verification code is[:\s]*<[^>]*>([A-Z0-9]{4,8})<',       # "verification code is: <b>066533</b>"
-            r'code is[:\s]*<[^>]*>([A-Z0-9]{4,8})<',                   # "code is: <b>066533</b>"
-
-            # Nested HTML patterns (for complex HTML structures)
-            r'code[:\s]*<[^>]*><[^>]*>([A-Z0-9]{4,8})<',               # "Code: <span><b>XY123Z</b></span>"
-            r'verification[:\s]*<[^>]*><[^>]*>([A-Z0-9]{4,8})<',       # Nested verification patterns
-
-            # Exact "Your verification code is:" patterns (highest priority)
-            r'your verification code is[:\s]+([A-Z0-9]{4,8})',
-            r'verification code is[:\s]+([A-Z0-9]{4,8})',
-            r'your code is[:\s]+([A-Z0-9]{4,8})',
-
-            # Common verification patterns
-            r'verification code[:\s]+([A-Z0-9]{4,8})',
-            r'your verification code[:\s]+([A-Z0-9]{4,8})',
-            r'your code[:\s]+([A-Z0-9]{4,8})',
-            r'enter code[:\s]+([A-Z0-9]{4,8})',
-            r'use code[:\s]+([A-Z0-9]{4,8})',
-            r'confirm.*?code[:\s]+([A-Z0-9]{4,8})',
-
-            # Service-specific patterns
-            r'augmentcode.*?code[:\s]+([A-Z0-9]{4,8})',
-            r'github.*?code[:\s]+([A-Z0-9]{4,8})',
-
-            # Generic code patterns (lower priority to avoid false positives)
-            r'([A-Z0-9]{4}-[A-Z0-9]{4})',  # Hyphenated codes
-        ]
-
-        # Fallback patterns for standalone numbers
-        fallback_patterns = [
-            r'([0-9]{6})',      # 6-digit numbers (most common)
-            r'([0-9]{4,8})',    # 4-8 digit numbers
-            r'([A-Z0-9]{4,8})', # 4-8 alphanumeric
-        ]
+        content_lower = content.lower()
 
         # If content is HTML, also try extracting from plain text version
         plain_text_content = None
-        if '<' in content and '>' in content:  # Likely HTML
+        if is_html:
             plain_text_content = self._html_to_text(content)
+        plain_text_lower = plain_text_content.lower() if plain_text_content else ""
+
+        # Every pattern except the hyphenated one needs one of these words, so
+        # most non-verification mail can be rejected before any regex runs
+        if ('-' not in content and '-' not in plain_text_lower
+                and not any(keyword in content_lower or keyword in plain_text_lower
+                            for keyword in _PREFILTER_KEYWORDS)):
+            return None
 
         # Try priority patterns on both HTML and plain text
-        for pattern in priority_patterns:
+        for regex in _PRIORITY_RES:
             # Try on original content first
-            matches = re.findall(pattern, content, re.IGNORECASE)
+            matches = regex.findall(content)
             if matches:
                 for match in matches:
                     if self._is_valid_verification_code(match):
@@ -442,7 +691,7 @@ class RealTempEmailService:
 
             # If HTML, also try on plain text version
             if plain_text_content:
-                matches = re.findall(pattern, plain_text_content, re.IGNORECASE)
+                matches = regex.findall(plain_text_content)
                 if matches:
                     for match in matches:
                         if self._is_valid_verification_code(match):
@@ -451,21 +700,19 @@ class RealTempEmailService:
         # If no priority patterns match, try fallback patterns
         # But only if the content seems to be about verification
         verification_keywords = ['verification', 'verify', 'code', 'confirm', 'authenticate']
-        content_lower = content.lower()
-        plain_text_lower = plain_text_content.lower() if plain_text_content else ""
 
         if any(keyword in content_lower or keyword in plain_text_lower for keyword in verification_keywords):
-            for pattern in fallback_patterns:
+            for regex in _FALLBACK_RES:
                 # Try on plain text first (more reliable for fallback patterns)
                 if plain_text_content:
-                    matches = re.findall(pattern, plain_text_content, re.IGNORECASE)
+                    matches = regex.findall(plain_text_content)
                     if matches:
                         for match in matches:
                             if self._is_valid_verification_code(match):
                                 return match.upper()
 
                 # Then try on original content
-                matches = re.findall(pattern, content, re.IGNORECASE)
+                matches = regex.findall(content)
                 if matches:
                     for match in matches:
                         if self._is_valid_verification_code(match):
@@ -478,22 +725,18 @@ class RealTempEmailService:
         if not code or len(code) < 4 or len(code) > 8:
             return False
 
-        # Skip obvious non-codes
-        if code.isdigit():
-            num = int(code)
-            # Skip years, common numbers, etc.
-            if 1900 <= num <= 2100:  # Years
-                return False
-            if num in [1234, 0000, 9999, 1111, 2222, 3333, 4444, 5555, 6666, 7777, 8888]:  # Common patterns
-                return False
-
         # Skip codes that are all the same character
-        if len(set(code)) == 1:
+        if code == code[0] * len(code):
             return False
 
-        # Skip codes that look like phone numbers or IDs
-        if len(code) == 10 and code.isdigit():
-            return False
+        # Skip obvious non-codes; compare digits as strings with leading
+        # zeros dropped, which matches comparing their integer values
+        if code.isdigit():
+            value = code.lstrip('0')
+            if len(value) == 4 and '1900' <= value <= '2100':  # Years
+                return False
+            if value in self._BLACKLIST_CODES:  # Common patterns
+                return False
 
         return True
 
@@ -503,30 +746,22 @@ class RealTempEmailService:
             return ""
 
         # Check if content is HTML
-        if not ('<html' in html_content.lower() or '<div' in html_content.lower() or '<p' in html_content.lower()):
+        if '<' not in html_content or not _HTML_SNIFF.search(html_content):
             return html_content  # Already plain text
 
         try:
-            # Try using BeautifulSoup if available
-            try:
-                from bs4 import BeautifulSoup
+            if _HAS_BS4:
                 soup = BeautifulSoup(html_content, 'html.parser')
                 # Extract text and clean it up
                 text = soup.get_text()
                 # Clean up whitespace
                 lines = [line.strip() for line in text.splitlines() if line.strip()]
                 return '\n'.join(lines)
-            except ImportError:
+            else:
                 # Fallback: simple HTML tag removal
-                import re
-                # Remove HTML tags
-                text = re.sub(r'<[^>]+>', '', html_content)
-                # Decode HTML entities
-                text = text.replace('&nbsp;', ' ')
-                text = text.replace('&amp;', '&')
-                text = text.replace('&lt;', '<')
-                text = text.replace('&gt;', '>')
-                text = text.replace('&quot;', '"')
+                text = _TAG_RE.sub('', html_content)
+                # Decode HTML entities (named and numeric) in one pass
+                text = html.unescape(text)
                 # Clean up whitespace
                 lines = [line.strip() for line in text.splitlines() if line.strip()]
                 return '\n'.join(lines)
@@ -555,28 +790,43 @@ class RealTempEmailService:
         self.stop_real_monitoring()
         if self.current_session:
             self.current_session.is_active = False
+            self._close_service_session(self.current_session.service_instance)
         self.current_session = None
         self._trigger_callback('on_status_change', 'Real session cleaned up')
 
     def get_available_domains(self) -> List[str]:
         """Get list of all available email domains"""
-        domains = []
-        for service in self.available_services:
-            domains.extend(service['typical_domains'])
-        return list(set(domains))  # Remove duplicates
+        return list(self._available_domains)
 
     def get_available_services(self) -> List[Dict]:
         """Get list of all available services with their information"""
         return [
             {
-                'name': service['name'],
-                'domains': service['typical_domains'],
-                'reliability': service['reliability'],
-                'description': service['description']
+                'name': service.name,
+                'domains': list(service.typical_domains),
+                'reliability': service.reliability,
+                'description': service.description
             }
             for service in self.available_services
         ]
 
+    # Uniform service API shared with InternxtTempEmailService
+    def generate(self, preferred_domain: str = None) -> Tuple[bool, str, Optional[RealEmailSession]]:
+        """Generate a new email address, optionally on a preferred domain"""
+        return self.generate_real_email(preferred_domain=preferred_domain)
+
+    def start_monitoring(self, poll_interval: int = DEFAULT_POLL_INTERVAL) -> bool:
+        """Start monitoring the inbox"""
+        return self.start_real_monitoring(poll_interval=poll_interval)
+
+    def stop_monitoring(self):
+        """Stop monitoring the inbox"""
+        self.stop_real_monitoring()
+
+    def check_now(self) -> Tuple[bool, str, List[RealEmailMessage]]:
+        """Manually check the inbox for new messages"""
+        return self.check_real_inbox_manually()
+
     def generate_email_with_domain(self, preferred_domain: str) -> Tuple[bool, str, Optional[RealEmailSession]]:
         """Generate email with specific domain preference"""
         return self.generate_real_email(preferred_domain=preferred_domain)
@@ -584,14 +834,14 @@ class RealTempEmailService:
     def get_service_stats(self) -> Dict:
         """Get statistics about available services"""
         total_services = len(self.available_services)
-        total_domains = len(self.get_available_domains())
-        high_reliability = len([s for s in self.available_services if s['reliability'] == 'high'])
+        available_domains = self.get_available_domains()
+        high_reliability = len([s for s in self.available_services if s.reliability == 'high'])
 
         return {
             'total_services': total_services,
-            'total_domains': total_domains,
+            'total_domains': len(available_domains),
             'high_reliability_services': high_reliability,
-            'available_domains': self.get_available_domains(),
+            'available_domains': available_domains,
             'services': self.get_available_services()
         }
     
@@ -615,48 +865,16 @@ class RealTempEmailService:
                 email_data = service.wait_for_new_email(timeout=timeout)
                 
                 if email_data:
-                    # Process the received email
-                    message_id = str(email_data.get('id', email_data.get('mail_id', 'new')))
-                    sender = email_data.get('from', email_data.get('sender', 'Unknown'))
-                    subject = email_data.get('subject', 'No Subject')
+                    # Reuse a message the monitor already fetched
+                    message_id = self._message_fields(email_data)[0]
+                    if message_id in self.current_session.seen_ids:
+                        return next(m for m in self.current_session.messages if m.message_id == message_id)
                     
-                    # Get content
-                    content = ""
-                    try:
-                        if hasattr(service, 'get_mail_content'):
-                            # Use correct parameter name: mail_id (not message_id)
-                            content_data = service.get_mail_content(mail_id=message_id)
-                            content = str(content_data)
-                        else:
-                            content = str(email_data)
-
-                        # Convert HTML to plain text if needed
-                        content = self._html_to_text(content)
-
-                    except Exception as e:
-                        content = email_data.get('content', email_data.get('body', str(email_data)))
-                        if content:
-                            content = self._html_to_text(content)
-                    
-                    # Extract verification code
-                    verification_code = self._extract_verification_code(content)
-                    
-                    message = RealEmailMessage(
-                        sender=sender,
-                        subject=subject,
-                        content=content,
-                        timestamp=datetime.now(),
-                        message_id=message_id,
-                        verification_code=verification_code
-                    )
-                    
-                    # Add to session
-                    self.current_session.messages.append(message)
+                    # Process the received email
+                    message = self._parse_email_data(service, email_data)
                     
-                    # Trigger callbacks
-                    self._trigger_callback('on_email_received', message)
-                    if verification_code:
-                        self._trigger_callback('on_verification_code', verification_code, message)
+                    # Add to session and trigger callbacks unless already seen
+                    self._deliver_new_messages([message])
                     
                     return message
                 
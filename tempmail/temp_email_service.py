@@ -4,19 +4,54 @@ Handles temporary email generation, monitoring, and verification code extraction
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
-import time
 import json
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import threading
-from bs4 import BeautifulSoup
-import random
-import string
+import secrets
+from collections import deque
+from lxml import etree
 
 
-@dataclass
+# Verification code patterns, tried in order (compiled once at import)
+_CODE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'verification code[:\s]+([A-Z0-9]{4,8})',  # "verification code: ABC123"
+    r'code[:\s]+([A-Z0-9]{4,8})',              # "code: 123456"
+    r'([0-9]{4,8})',                           # "123456" (6-8 digits)
+    r'([A-Z0-9]{4}-[A-Z0-9]{4})',             # "ABCD-1234"
+    r'confirm.*?([A-Z0-9]{4,8})',             # "confirm with ABC123"
+    r'enter.*?([A-Z0-9]{4,8})',               # "enter code ABC123"
+))
+
+# Generated address on the service page
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+# Inbox scraping patterns
+_EMAIL_ELEMENT_CLASS_RE = re.compile(r'(email|message|mail)', re.I)
+_SENDER_RE = re.compile(r'from[:\s]+([^\n]+)', re.IGNORECASE)
+_SUBJECT_RE = re.compile(r'subject[:\s]+([^\n]+)', re.IGNORECASE)
+# Bytes fed to the inbox parser per read
+_INBOX_CHUNK_SIZE = 16384
+# Elements whose text is not page text (BeautifulSoup's get_text skips them too)
+_NON_TEXT_TAGS = frozenset(('script', 'style', 'template'))
+
+
+def _element_strings(element):
+    """Yield the text strings under an lxml element in document order, like get_text"""
+    if element.text and element.tag not in _NON_TEXT_TAGS:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str):  # Comments and processing instructions carry no text
+            yield from _element_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+@dataclass(slots=True)
 class EmailMessage:
     """Represents an email message"""
     sender: str
@@ -26,7 +61,7 @@ class EmailMessage:
     verification_code: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TempEmailSession:
     """Represents a temporary email session"""
     email_address: str
@@ -35,6 +70,7 @@ class TempEmailSession:
     expires_at: datetime
     messages: List[EmailMessage]
     is_active: bool = True
+    seen_keys: Set[tuple] = field(default_factory=set)  # (sender, subject, content) of messages
 
 
 class InternxtTempEmailService:
@@ -42,6 +78,7 @@ class InternxtTempEmailService:
     
     BASE_URL = "https://internxt.com/temporary-email"
     API_BASE = "https://internxt.com/api/temp-email"  # Hypothetical API endpoint
+    DEFAULT_POLL_INTERVAL = 15
     
     def __init__(self):
         self.session = requests.Session()
@@ -53,24 +90,38 @@ class InternxtTempEmailService:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
+        # Keep the Internxt connection alive across generate and every poll, and
+        # retry transient gateway errors instead of failing the poll
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=2, pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.3,
+                              status_forcelist=(502, 503, 504))
+        ))
         self.current_session: Optional[TempEmailSession] = None
         self.monitoring_thread: Optional[threading.Thread] = None
         self.monitoring_active = False
+        # Set by stop_monitoring to cut the monitor's sleep short
+        self._stop_event = threading.Event()
+        # Validators of the last inbox page, sent back so unchanged polls get a 304
+        self._last_etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        # Tuples are replaced, never mutated, so the monitor thread can iterate
+        # a snapshot while callbacks are added
         self.callbacks = {
-            'on_email_received': [],
-            'on_verification_code': [],
-            'on_error': [],
-            'on_status_change': []
+            'on_email_received': (),
+            'on_verification_code': (),
+            'on_error': (),
+            'on_status_change': ()
         }
     
     def add_callback(self, event_type: str, callback):
         """Add callback for events"""
         if event_type in self.callbacks:
-            self.callbacks[event_type].append(callback)
+            self.callbacks[event_type] += (callback,)
     
     def _trigger_callback(self, event_type: str, *args, **kwargs):
         """Trigger callbacks for an event"""
-        for callback in self.callbacks.get(event_type, []):
+        for callback in self.callbacks.get(event_type, ()):
             try:
                 callback(*args, **kwargs)
             except Exception as e:
@@ -88,15 +139,12 @@ class InternxtTempEmailService:
             response = self.session.get(self.BASE_URL, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
             # Look for email address in the page
-            email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-            emails_found = re.findall(email_pattern, response.text)
+            email_match = _EMAIL_RE.search(response.text)
             
-            if emails_found:
+            if email_match:
                 # Use the first email found (likely the generated one)
-                email_address = emails_found[0]
+                email_address = email_match.group(0)
             else:
                 # Fallback: Generate a random email with common temp email domains
                 email_address = self._generate_fallback_email()
@@ -114,6 +162,9 @@ class InternxtTempEmailService:
                 messages=[],
                 is_active=True
             )
+            # A new address must get a full inbox page on its first poll
+            self._last_etag = None
+            self._last_modified = None
             
             self._trigger_callback('on_status_change', f'Generated email: {email_address}')
             return True, f"Generated temporary email: {email_address}", self.current_session
@@ -127,6 +178,10 @@ class InternxtTempEmailService:
             self._trigger_callback('on_error', error_msg)
             return False, error_msg, None
     
+    def generate(self, preferred_domain: Optional[str] = None) -> Tuple[bool, str, Optional[TempEmailSession]]:
+        """Generate a new email address (domain preference is not supported)"""
+        return self.generate_temp_email()
+    
     def _generate_fallback_email(self) -> str:
         """Generate a fallback email address"""
         # Common temporary email domains
@@ -136,14 +191,14 @@ class InternxtTempEmailService:
         ]
         
         # Generate random username
-        username = ''.join(random.choices(string.ascii_lowercase + string.digits, k=10))
-        domain = random.choice(domains)
+        username = secrets.token_hex(5)
+        domain = secrets.choice(domains)
         
         return f"{username}@{domain}"
     
     def _generate_session_id(self) -> str:
         """Generate a unique session ID"""
-        return ''.join(random.choices(string.ascii_letters + string.digits, k=16))
+        return secrets.token_urlsafe(12)
     
     def start_monitoring(self, poll_interval: int = 15) -> bool:
         """
@@ -159,6 +214,7 @@ class InternxtTempEmailService:
             return True
         
         self.monitoring_active = True
+        self._stop_event.clear()
         self.monitoring_thread = threading.Thread(
             target=self._monitor_inbox,
             args=(poll_interval,),
@@ -172,6 +228,7 @@ class InternxtTempEmailService:
     def stop_monitoring(self):
         """Stop monitoring the email inbox"""
         self.monitoring_active = False
+        self._stop_event.set()
         if self.monitoring_thread:
             self.monitoring_thread.join(timeout=2)
         self._trigger_callback('on_status_change', 'Stopped email monitoring')
@@ -186,8 +243,8 @@ class InternxtTempEmailService:
                     self._trigger_callback('on_status_change', 'Email session expired')
                     break
                 
-                # Check for new emails
-                new_messages = self._fetch_new_messages()
+                # Check for new emails (every poll returns the whole inbox)
+                new_messages = [m for m in self._fetch_new_messages() if self._is_new_message(m)]
                 
                 for message in new_messages:
                     self.current_session.messages.append(message)
@@ -197,17 +254,33 @@ class InternxtTempEmailService:
                     if message.verification_code:
                         self._trigger_callback('on_verification_code', message.verification_code, message)
                 
-                time.sleep(poll_interval)
+                if self._stop_event.wait(poll_interval):
+                    break
                 
             except Exception as e:
                 self._trigger_callback('on_error', f"Monitoring error: {str(e)}")
-                time.sleep(poll_interval * 2)  # Wait longer on error
+                if self._stop_event.wait(poll_interval * 2):  # Wait longer on error
+                    break
+    
+    def _is_new_message(self, message: EmailMessage) -> bool:
+        """Record a message's key in the session; False if it was already seen"""
+        # Scraped messages get a fresh timestamp on every poll, so it is not part of
+        # the key. The whole content is: a re-sent code mail shares sender, subject
+        # and the From/Subject lines that open the scraped text.
+        key = (message.sender, message.subject, message.content)
+        seen_keys = self.current_session.seen_keys
+        if key in seen_keys:
+            return False
+        seen_keys.add(key)
+        return True
     
     def _fetch_new_messages(self) -> List[EmailMessage]:
         """Fetch new messages from the inbox"""
         try:
             # Method 1: Try to scrape Internxt inbox
             messages = self._scrape_internxt_inbox()
+            if messages is None:
+                return []  # Inbox unchanged; don't fall through to the other methods
             if messages:
                 return messages
 
@@ -223,42 +296,43 @@ class InternxtTempEmailService:
             self._trigger_callback('on_error', f"Error fetching messages: {str(e)}")
             return []
 
-    def _scrape_internxt_inbox(self) -> List[EmailMessage]:
-        """Scrape Internxt inbox for new messages"""
+    def _scrape_internxt_inbox(self) -> Optional[List[EmailMessage]]:
+        """Scrape Internxt inbox for new messages, or None if the page is unchanged"""
         try:
-            # Make request to Internxt temp email page
-            response = self.session.get(self.BASE_URL, timeout=10)
-            response.raise_for_status()
+            # Make request to Internxt temp email page, conditional on the last one
+            headers = {}
+            if self._last_etag:
+                headers['If-None-Match'] = self._last_etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+            with self.session.get(self.BASE_URL, headers=headers, stream=True, timeout=10) as response:
+                if response.status_code == 304:
+                    return None  # Page unchanged since the last poll
+                response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            messages = []
+                # Parse while the page downloads. Without a charset in the headers
+                # assume UTF-8, as libxml2 would otherwise fall back to Latin-1
+                declared = 'charset' in response.headers.get('Content-Type', '').lower()
+                parser = etree.HTMLPullParser(
+                    events=('start', 'end'), tag=('div', 'li'),
+                    encoding=response.encoding if declared else 'utf-8'
+                )
+                messages = []
+                # Look for email elements in the page; containers can nest, so each
+                # is handled once closed but in document (opening) order
+                # This would need to be adjusted based on Internxt's actual HTML structure
+                open_elements = deque()
+                closed = set()
 
-            # Look for email elements in the page
-            # This would need to be adjusted based on Internxt's actual HTML structure
-            email_elements = soup.find_all(['div', 'li'], class_=re.compile(r'(email|message|mail)', re.I))
+                for chunk in response.iter_content(_INBOX_CHUNK_SIZE):
+                    parser.feed(chunk)
+                    self._collect_inbox_messages(parser, open_elements, closed, messages)
+                parser.close()
+                self._collect_inbox_messages(parser, open_elements, closed, messages)
 
-            for element in email_elements:
-                try:
-                    # Extract email information
-                    sender = self._extract_text_by_pattern(element, r'from[:\s]+([^\n]+)', 'sender')
-                    subject = self._extract_text_by_pattern(element, r'subject[:\s]+([^\n]+)', 'subject')
-                    content = element.get_text(strip=True)
-
-                    if sender and subject and content:
-                        # Extract verification code if present
-                        verification_code = self.extract_verification_code(content)
-
-                        message = EmailMessage(
-                            sender=sender,
-                            subject=subject,
-                            content=content,
-                            timestamp=datetime.now(),
-                            verification_code=verification_code
-                        )
-                        messages.append(message)
-
-                except Exception as e:
-                    continue  # Skip malformed messages
+                # Only a fully processed page may be skipped by the next poll
+                self._last_etag = response.headers.get('ETag')
+                self._last_modified = response.headers.get('Last-Modified')
 
             return messages
 
@@ -266,10 +340,52 @@ class InternxtTempEmailService:
             self._trigger_callback('on_error', f"Error scraping Internxt: {str(e)}")
             return []
 
-    def _extract_text_by_pattern(self, element, pattern: str, field_name: str) -> Optional[str]:
-        """Extract text using regex pattern"""
-        text = element.get_text()
-        match = re.search(pattern, text, re.IGNORECASE)
+    def _collect_inbox_messages(self, parser, open_elements: deque, closed: set,
+                                messages: List[EmailMessage]):
+        """Turn the message containers the parser has finished into EmailMessages"""
+        for event, element in parser.read_events():
+            if not _EMAIL_ELEMENT_CLASS_RE.search(element.get('class', '')):
+                continue
+            if event == 'start':
+                open_elements.append(element)
+                continue
+            closed.add(element)
+            while open_elements and open_elements[0] in closed:
+                element = open_elements.popleft()
+                closed.discard(element)
+                try:
+                    message = self._message_from_element(element)
+                except Exception:
+                    continue  # Skip malformed messages
+                if message:
+                    messages.append(message)
+
+    def _message_from_element(self, element) -> Optional[EmailMessage]:
+        """Build a message from a scraped container, if it has sender, subject and content"""
+        # Extract email information
+        strings = list(_element_strings(element))
+        text = ''.join(strings)
+        sender = self._extract_text_by_pattern(text, _SENDER_RE)
+        subject = self._extract_text_by_pattern(text, _SUBJECT_RE)
+        content = ''.join(string.strip() for string in strings)
+
+        if not (sender and subject and content):
+            return None
+
+        # Extract verification code if present
+        verification_code = self.extract_verification_code(content)
+
+        return EmailMessage(
+            sender=sender,
+            subject=subject,
+            content=content,
+            timestamp=datetime.now(),
+            verification_code=verification_code
+        )
+
+    def _extract_text_by_pattern(self, text: str, regex: Pattern) -> Optional[str]:
+        """Extract text using a compiled regex pattern"""
+        match = regex.search(text)
         return match.group(1).strip() if match else None
 
     def _try_alternative_services(self) -> List[EmailMessage]:
@@ -285,9 +401,8 @@ class InternxtTempEmailService:
             return []
 
         # Simulate receiving a verification email after some time
-        import random
-        if random.random() < 0.1:  # 10% chance each check
-            verification_code = ''.join(random.choices('0123456789', k=6))
+        if secrets.randbelow(10) == 0:  # 10% chance each check
+            verification_code = f"{secrets.randbelow(1_000_000):06d}"
             mock_message = EmailMessage(
                 sender="noreply@augmentcode.com",
                 subject="AugmentCode Email Verification",
@@ -307,15 +422,14 @@ class InternxtTempEmailService:
         
         try:
             self._trigger_callback('on_status_change', 'Checking inbox...')
-            new_messages = self._fetch_new_messages()
+            new_messages = [m for m in self._fetch_new_messages() if self._is_new_message(m)]
             
             for message in new_messages:
-                if message not in self.current_session.messages:
-                    self.current_session.messages.append(message)
-                    self._trigger_callback('on_email_received', message)
-                    
-                    if message.verification_code:
-                        self._trigger_callback('on_verification_code', message.verification_code, message)
+                self.current_session.messages.append(message)
+                self._trigger_callback('on_email_received', message)
+                
+                if message.verification_code:
+                    self._trigger_callback('on_verification_code', message.verification_code, message)
             
             count = len(new_messages)
             status_msg = f"Found {count} new message{'s' if count != 1 else ''}"
@@ -328,30 +442,22 @@ class InternxtTempEmailService:
             self._trigger_callback('on_error', error_msg)
             return False, error_msg, []
     
+    def check_now(self) -> Tuple[bool, str, List[EmailMessage]]:
+        """Manually check the inbox for new messages"""
+        return self.check_inbox_manually()
+    
     def extract_verification_code(self, email_content: str) -> Optional[str]:
         """
         Extract verification code from email content
         Supports various formats used by services like AugmentCode
         """
-        # Common verification code patterns
-        patterns = [
-            r'verification code[:\s]+([A-Z0-9]{4,8})',  # "verification code: ABC123"
-            r'code[:\s]+([A-Z0-9]{4,8})',              # "code: 123456"
-            r'([0-9]{4,8})',                           # "123456" (6-8 digits)
-            r'([A-Z0-9]{4}-[A-Z0-9]{4})',             # "ABCD-1234"
-            r'confirm.*?([A-Z0-9]{4,8})',             # "confirm with ABC123"
-            r'enter.*?([A-Z0-9]{4,8})',               # "enter code ABC123"
-        ]
-        
-        email_upper = email_content.upper()
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, email_upper, re.IGNORECASE)
-            if matches:
-                # Return the first match that looks like a verification code
-                for match in matches:
-                    if len(match) >= 4 and len(match) <= 8:
-                        return match
+        # The patterns ignore case, so only the returned code is upper-cased
+        for regex in _CODE_PATTERNS:
+            # Return the first match that looks like a verification code
+            for match in regex.finditer(email_content):
+                code = match.group(1).upper()
+                if len(code) >= 4 and len(code) <= 8:
+                    return code
         
         return None
     
@@ -4,11 +4,20 @@ Specialized for extracting verification codes from various email services
 """
 
 import re
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Pattern
 from dataclasses import dataclass
 
+try:
+    import hyperscan
+    _HAS_HYPERSCAN = True
+except ImportError:
+    _HAS_HYPERSCAN = False
 
-@dataclass
+# Python's \s also matches the \x1c-\x1f separators, hyperscan's does not
+_HS_WHITESPACE = r'\s\x1c-\x1f'
+
+
+@dataclass(slots=True)
 class VerificationMatch:
     """Represents a found verification code with metadata"""
     code: str
@@ -18,6 +27,11 @@ class VerificationMatch:
     position: int  # Position in text
 
 
+# A raw pattern hit: (code, confidence, pattern_type, start, end). Only the best
+# hit per code is turned into a VerificationMatch with its context slice.
+_Candidate = Tuple[str, float, str, int, int]
+
+
 class AdvancedVerificationParser:
     """Advanced parser for extracting verification codes from emails"""
     
@@ -29,25 +43,29 @@ class AdvancedVerificationParser:
                 'pattern': r'verification code[:\s]+([A-Z0-9]{4,8})',
                 'confidence': 0.95,
                 'type': 'verification_code_explicit',
-                'flags': re.IGNORECASE
+                'flags': re.IGNORECASE,
+                'requires': 'code'
             },
             {
                 'pattern': r'your code[:\s]+([A-Z0-9]{4,8})',
                 'confidence': 0.95,
                 'type': 'your_code_explicit',
-                'flags': re.IGNORECASE
+                'flags': re.IGNORECASE,
+                'requires': 'code'
             },
             {
                 'pattern': r'enter[:\s]+([A-Z0-9]{4,8})',
                 'confidence': 0.90,
                 'type': 'enter_code',
-                'flags': re.IGNORECASE
+                'flags': re.IGNORECASE,
+                'requires': 'enter'
             },
             {
                 'pattern': r'confirm.*?code[:\s]+([A-Z0-9]{4,8})',
                 'confidence': 0.90,
                 'type': 'confirm_code',
-                'flags': re.IGNORECASE
+                'flags': re.IGNORECASE,
+                'requires': 'code'
             },
             
             # Medium confidence patterns
@@ -55,25 +73,29 @@ class AdvancedVerificationParser:
                 'pattern': r'code[:\s]+([A-Z0-9]{4,8})',
                 'confidence': 0.80,
                 'type': 'code_generic',
-                'flags': re.IGNORECASE
+                'flags': re.IGNORECASE,
+                'requires': 'code'
             },
             {
                 'pattern': r'([0-9]{6})',  # 6-digit numbers (common for 2FA)
                 'confidence': 0.75,
                 'type': 'six_digit_number',
-                'flags': 0
+                'flags': 0,
+                'requires': '[0-9]'
             },
             {
                 'pattern': r'([A-Z0-9]{4}-[A-Z0-9]{4})',  # Format: ABCD-1234
                 'confidence': 0.85,
                 'type': 'hyphenated_code',
-                'flags': 0
+                'flags': 0,
+                'requires': '-'
             },
             {
                 'pattern': r'([A-Z]{2}[0-9]{4})',  # Format: AB1234
                 'confidence': 0.70,
                 'type': 'alpha_numeric_6',
-                'flags': 0
+                'flags': 0,
+                'requires': '[0-9]'
             },
             
             # Lower confidence patterns (broader matches)
@@ -81,7 +103,8 @@ class AdvancedVerificationParser:
                 'pattern': r'([0-9]{4,8})',  # 4-8 digit numbers
                 'confidence': 0.60,
                 'type': 'numeric_code',
-                'flags': 0
+                'flags': 0,
+                'requires': '[0-9]'
             },
             {
                 'pattern': r'([A-Z0-9]{4,8})',  # 4-8 alphanumeric
@@ -108,6 +131,27 @@ class AdvancedVerificationParser:
             ]
         }
         
+        # Compile every pattern once so the per-email path only runs the scanner
+        for pattern_info in self.patterns:
+            pattern_info['regex'] = re.compile(pattern_info['pattern'], pattern_info.get('flags', 0))
+        
+        # Patterns only run when their anchor (a keyword, a digit, a hyphen)
+        # occurs in the email; a miss is one short search instead of a full pass
+        self.anchor_regexes = {
+            p['requires']: re.compile(p['requires'], p['flags'])
+            for p in self.patterns if 'requires' in p
+        }
+        self._hs_db = self._build_hyperscan_db()
+        
+        # Sender -> service, one group per service in priority order; each
+        # alternative scans the whole sender so earlier services win
+        self._service_re = re.compile(r'(?:.*?(augment)|.*?(github)|.*?(google|gmail))', re.IGNORECASE | re.DOTALL)
+        self._service_names = (None, 'augmentcode', 'github', 'google')
+        self.service_regexes = {
+            service: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for service, patterns in self.service_patterns.items()
+        }
+        
         # Context keywords that increase confidence
         self.positive_keywords = [
             'verification', 'verify', 'confirm', 'authenticate', 'code',
@@ -119,29 +163,62 @@ class AdvancedVerificationParser:
             'invoice', 'receipt', 'order', 'tracking', 'phone', 'address',
             'zip', 'postal', 'reference', 'transaction'
         ]
+        
+        # One scan per context finds every keyword present; the lookahead keeps
+        # overlapping keywords from hiding each other
+        self._positive_re = re.compile('(?=(' + '|'.join(map(re.escape, self.positive_keywords)) + '))')
+        self._negative_re = re.compile('(?=(' + '|'.join(map(re.escape, self.negative_keywords)) + '))')
+        
+        # Highest base confidence any pattern assigns (service patterns use 0.95)
+        self._top_confidence = max([0.95] + [p['confidence'] for p in self.patterns])
     
-    def extract_verification_codes(self, email_content: str, sender: str = "") -> List[VerificationMatch]:
+    def extract_verification_codes(self, email_content: str, sender: str = "",
+                                   early_exit_confidence: Optional[float] = None) -> List[VerificationMatch]:
         """
         Extract all potential verification codes from email content
         Returns list of matches sorted by confidence
+        Args:
+            early_exit_confidence: If the first candidate found has the top base
+                confidence and scores at least this much, return it alone
+                without running the remaining patterns
         """
         matches = []
-        email_lower = email_content.lower()
         
         # Try service-specific patterns first
         service_matches = self._extract_service_specific(email_content, sender)
         matches.extend(service_matches)
+        first_checked = False
+        if early_exit_confidence is not None and matches:
+            first_checked = True
+            early_match = self._early_match(matches[0], email_content, early_exit_confidence)
+            if early_match:
+                return [early_match]
         
-        # Try general patterns
-        for pattern_info in self.patterns:
+        # Try general patterns. Hyperscan, when available, tells in one scan which
+        # patterns match at all; otherwise patterns whose anchor is absent are
+        # skipped (no keyword, no digit for digit shapes, no hyphen for ABCD-1234).
+        present = self._scan_present_patterns(email_content)
+        if present is None:
+            anchors = {anchor for anchor, regex in self.anchor_regexes.items() if regex.search(email_content)}
+        for index, pattern_info in enumerate(self.patterns):
+            if present is not None:
+                if index not in present:
+                    continue
+            elif pattern_info.get('requires') and pattern_info['requires'] not in anchors:
+                continue
             pattern_matches = self._find_pattern_matches(
                 email_content, 
-                pattern_info['pattern'],
+                pattern_info['regex'],
                 pattern_info['confidence'],
-                pattern_info['type'],
-                pattern_info.get('flags', 0)
+                pattern_info['type']
             )
             matches.extend(pattern_matches)
+            
+            if early_exit_confidence is not None and matches and not first_checked:
+                first_checked = True
+                early_match = self._early_match(matches[0], email_content, early_exit_confidence)
+                if early_match:
+                    return [early_match]
         
         # Remove duplicates and adjust confidence based on context
         unique_matches = self._deduplicate_and_score(matches, email_content)
@@ -151,56 +228,86 @@ class AdvancedVerificationParser:
         
         return unique_matches
     
-    def _extract_service_specific(self, content: str, sender: str) -> List[VerificationMatch]:
+    def _early_match(self, candidate: _Candidate, email_content: str,
+                     early_exit_confidence: float) -> Optional[VerificationMatch]:
+        """Score the first candidate found, if it can end the search early"""
+        # A later hit for the same code only replaces it with a higher base confidence
+        if candidate[1] < self._top_confidence:
+            return None
+        match = self._score_candidate(candidate, email_content)
+        return match if match.confidence >= early_exit_confidence else None
+    
+    def _build_hyperscan_db(self):
+        """Compile the general patterns into one hyperscan database, if available"""
+        if not _HAS_HYPERSCAN:
+            return None
+        
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                # Every \s in the patterns sits inside a character class
+                expressions=[p['pattern'].replace(r'\s', _HS_WHITESPACE).encode() for p in self.patterns],
+                ids=list(range(len(self.patterns))),
+                flags=[
+                    hyperscan.HS_FLAG_SINGLEMATCH
+                    | (hyperscan.HS_FLAG_CASELESS if p['flags'] & re.IGNORECASE else 0)
+                    for p in self.patterns
+                ]
+            )
+            return db
+        except hyperscan.error:
+            return None  # Fall back to the re passes
+    
+    def _scan_present_patterns(self, content: str) -> Optional[set]:
+        """Indexes of the general patterns that match somewhere in content, or None without hyperscan"""
+        # re's case-insensitive classes also accept letters like 'ı' and the Kelvin
+        # sign that hyperscan does not fold, so only ASCII text is prefiltered
+        if self._hs_db is None or not content.isascii():
+            return None
+        
+        present = set()
+        
+        def on_match(pattern_id, start, end, flags, context):
+            present.add(pattern_id)
+        
+        try:
+            self._hs_db.scan(content.encode(), match_event_handler=on_match)
+        except hyperscan.error:
+            return None
+        return present
+    
+    def _extract_service_specific(self, content: str, sender: str) -> List[_Candidate]:
         """Extract codes using service-specific patterns"""
         matches = []
-        sender_lower = sender.lower()
         
         # Determine service from sender
-        service = None
-        if 'augment' in sender_lower:
-            service = 'augmentcode'
-        elif 'github' in sender_lower:
-            service = 'github'
-        elif 'google' in sender_lower or 'gmail' in sender_lower:
-            service = 'google'
-        
-        if service and service in self.service_patterns:
-            for pattern in self.service_patterns[service]:
+        service_match = self._service_re.match(sender)
+        service = self._service_names[service_match.lastindex] if service_match else None
+        
+        if service and service in self.service_regexes:
+            for regex in self.service_regexes[service]:
                 pattern_matches = self._find_pattern_matches(
-                    content, pattern, 0.95, f'{service}_specific', re.IGNORECASE
+                    content, regex, 0.95, f'{service}_specific'
                 )
                 matches.extend(pattern_matches)
         
         return matches
     
-    def _find_pattern_matches(self, content: str, pattern: str, base_confidence: float, 
-                            pattern_type: str, flags: int = 0) -> List[VerificationMatch]:
-        """Find all matches for a specific pattern"""
+    def _find_pattern_matches(self, content: str, regex: Pattern, base_confidence: float, 
+                            pattern_type: str) -> List[_Candidate]:
+        """Find all matches for a specific compiled pattern"""
         matches = []
         
         try:
-            for match in re.finditer(pattern, content, flags):
+            for match in regex.finditer(content):
                 code = match.group(1) if match.groups() else match.group(0)
                 
                 # Skip if code doesn't look valid
                 if not self._is_valid_code(code):
                     continue
                 
-                # Get context around the match
-                start = max(0, match.start() - 50)
-                end = min(len(content), match.end() + 50)
-                context = content[start:end]
-                
-                verification_match = VerificationMatch(
-                    code=code,
-                    confidence=base_confidence,
-                    pattern_type=pattern_type,
-                    context=context,
-                    position=match.start()
-                )
-                
-                matches.append(verification_match)
+                # Context is sliced later, for the best match of each code only
+                matches.append((code, base_confidence, pattern_type, match.start(), match.end()))
                 
         except re.error:
             pass  # Skip invalid regex patterns
@@ -210,65 +317,73 @@ class AdvancedVerificationParser:
     def _is_valid_code(self, code: str) -> bool:
         """Check if a code looks like a valid verification code"""
         # Basic validation rules
-        if len(code) < 4 or len(code) > 8:
+        length = len(code)
+        if length < 4 or length > 8:
             return False
         
         # Skip codes that are all the same character
-        if len(set(code)) == 1:
+        if code.count(code[0]) == length:
             return False
         
-        # Skip codes that look like years, phone numbers, etc.
+        # Skip codes that look like years (numerically, so '02024' counts too).
+        # Codes only ever hold ASCII digits, so equal-length strings compare as numbers.
         if code.isdigit():
-            num = int(code)
-            if 1900 <= num <= 2100:  # Likely a year
-                return False
-            if len(code) == 10:  # Likely a phone number
+            year = code.lstrip('0')
+            if len(year) == 4 and '1900' <= year <= '2100':  # Likely a year
                 return False
         
         return True
     
-    def _deduplicate_and_score(self, matches: List[VerificationMatch], 
+    def _deduplicate_and_score(self, matches: List[_Candidate], 
                               email_content: str) -> List[VerificationMatch]:
         """Remove duplicates and adjust confidence based on context"""
-        # Group by code
-        code_groups = {}
+        # Keep the highest-confidence match per code (the first one on ties)
+        best_by_code = {}
         for match in matches:
-            if match.code not in code_groups:
-                code_groups[match.code] = []
-            code_groups[match.code].append(match)
+            best = best_by_code.get(match[0])
+            if best is None or match[1] > best[1]:
+                best_by_code[match[0]] = match
         
         unique_matches = []
-        email_lower = email_content.lower()
         
-        for code, group in code_groups.items():
-            # Take the match with highest confidence
-            best_match = max(group, key=lambda x: x.confidence)
-            
-            # Adjust confidence based on context
-            context_lower = best_match.context.lower()
-            
-            # Boost confidence for positive keywords
-            positive_boost = sum(0.05 for keyword in self.positive_keywords 
-                               if keyword in context_lower)
-            
-            # Reduce confidence for negative keywords
-            negative_penalty = sum(0.1 for keyword in self.negative_keywords 
-                                 if keyword in context_lower)
-            
-            # Adjust confidence
-            adjusted_confidence = min(1.0, best_match.confidence + positive_boost - negative_penalty)
-            
-            best_match.confidence = adjusted_confidence
-            unique_matches.append(best_match)
+        for candidate in best_by_code.values():
+            unique_matches.append(self._score_candidate(candidate, email_content))
         
         return unique_matches
     
+    def _score_candidate(self, candidate: _Candidate, email_content: str) -> VerificationMatch:
+        """Build the match for a candidate with its confidence adjusted by context"""
+        code, confidence, pattern_type, start, end = candidate
+        best_match = VerificationMatch(
+            code=code,
+            confidence=confidence,
+            pattern_type=pattern_type,
+            context=email_content[max(0, start - 50):end + 50],
+            position=start
+        )
+        
+        # Adjust confidence based on context
+        context_lower = best_match.context.lower()
+        
+        # Boost confidence for positive keywords
+        positive_boost = sum(0.05 for _ in set(self._positive_re.findall(context_lower)))
+        
+        # Reduce confidence for negative keywords
+        negative_penalty = sum(0.1 for _ in set(self._negative_re.findall(context_lower)))
+        
+        # Adjust confidence
+        adjusted_confidence = min(1.0, best_match.confidence + positive_boost - negative_penalty)
+        
+        best_match.confidence = adjusted_confidence
+        return best_match
+    
     def get_best_verification_code(self, email_content: str, sender: str = "") -> Optional[str]:
         """
         Get the most likely verification code from email content
         Returns the code with highest confidence, or None if no good matches
         """
-        matches = self.extract_verification_codes(email_content, sender)
+        # Nothing scores above 1.0, so a first candidate at 1.0 is already the best
+        matches = self.extract_verification_codes(email_content, sender, early_exit_confidence=1.0)
         
         if not matches:
             return None
@@ -280,6 +395,20 @@ class AdvancedVerificationParser:
         
         return None
     
+    def summarize(self, email_content: str, sender: str = "") -> Dict:
+        """
+        Summary of the best verification code in an email
+        Returns the has_verification_code / best_code / best_confidence fields of
+        analyze_email_for_codes, stopping early when the first candidate is certain
+        """
+        matches = self.extract_verification_codes(email_content, sender, early_exit_confidence=1.0)
+        
+        return {
+            'has_verification_code': len(matches) > 0,
+            'best_code': matches[0].code if matches else None,
+            'best_confidence': matches[0].confidence if matches else 0.0
+        }
+    
     def analyze_email_for_codes(self, email_content: str, sender: str = "") -> Dict:
         """
         Comprehensive analysis of email for verification codes
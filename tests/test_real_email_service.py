@@ -0,0 +1,71 @@
+"""
+Tests for RealTempEmailService provider fallback
+Run with: python -m unittest discover tests
+"""
+
+import threading
+import unittest
+
+from tempmail.real_email_service import RealTempEmailService, ServiceInfo
+
+
+class _FakeService:
+    """Stand-in for a temp-mails provider instance"""
+
+    def __init__(self, email):
+        self.email = email
+
+
+def _provider(name):
+    return ServiceInfo(name, type(name, (), {}), (f'{name.lower()}.test',), 'high', '')
+
+
+class TryServicesConcurrentlyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = RealTempEmailService()
+        self.service.GENERATE_TIMEOUT = 0.3
+        self.release = threading.Event()
+        self.constructed = []
+        self.statuses = []
+        self.service._trigger_callback = lambda event_type, *args: self.statuses.append(args[0])
+
+    def tearDown(self):
+        # Let the hung attempts finish so their threads exit
+        self.release.set()
+
+    def _stub_create_service(self, hanging):
+        def create_service(service_class):
+            name = service_class.__name__
+            self.constructed.append(name)
+            if name in hanging:
+                self.release.wait(2.5)
+            return _FakeService(f'{name.lower()}@{name.lower()}.test'), f'{name.lower()}@{name.lower()}.test'
+        self.service._create_service = create_service
+
+    def test_falls_back_past_hung_providers(self):
+        providers = [_provider(name) for name in ('A', 'B', 'C', 'D')]
+        self._stub_create_service(hanging={'A', 'B', 'C'})
+
+        result = self.service._try_services_concurrently(providers)
+
+        self.assertIsNotNone(result)
+        service_info, service_instance, email_address = result
+        self.assertEqual(service_info.name, 'D')
+        self.assertEqual(email_address, 'd@d.test')
+        self.assertIn('D', self.constructed)
+        self.assertNotIn('❌ D timed out', self.statuses)
+        for name in ('A', 'B', 'C'):
+            self.assertIn(f'❌ {name} timed out', self.statuses)
+
+    def test_returns_none_when_every_provider_hangs(self):
+        providers = [_provider(name) for name in ('A', 'B', 'C', 'D')]
+        self._stub_create_service(hanging={'A', 'B', 'C', 'D'})
+
+        self.assertIsNone(self.service._try_services_concurrently(providers))
+        self.assertEqual(self.constructed, ['A', 'B', 'C', 'D'])
+        self.assertEqual(sum(s.endswith('timed out') for s in self.statuses), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
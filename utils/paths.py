@@ -1,8 +1,10 @@
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=None)
 def get_home_dir() -> str:
     """
     Get the user's home directory across different platforms.
@@ -13,6 +15,7 @@ def get_home_dir() -> str:
     return str(Path.home())
 
 
+@lru_cache(maxsize=None)
 def get_app_data_dir() -> str:
     """
     Get the application data directory across different platforms.
@@ -36,6 +39,7 @@ def get_app_data_dir() -> str:
         return os.path.join(str(Path.home()), ".local/share")
 
 
+@lru_cache(maxsize=None)
 def get_storage_path() -> str:
     """
     Get the storage.json path across different platforms.
@@ -60,6 +64,7 @@ def get_storage_path() -> str:
         return os.path.join(str(Path.home()), ".config", "Code", "User", "globalStorage", "storage.json")
 
 
+@lru_cache(maxsize=None)
 def get_db_path() -> str:
     """
     Get the state.vscdb path across different platforms.
@@ -84,6 +89,7 @@ def get_db_path() -> str:
         return os.path.join(str(Path.home()), ".config", "Code", "User", "globalStorage", "state.vscdb")
 
 
+@lru_cache(maxsize=None)
 def get_machine_id_path() -> str:
     """
     Get the machine ID file path across different platforms.
@@ -108,6 +114,7 @@ def get_machine_id_path() -> str:
         return os.path.join(str(Path.home()), ".config", "Code", "machineid")
 
 
+@lru_cache(maxsize=None)
 def get_workspace_storage_path() -> str:
     """
     Get the workspaceStorage path across different platforms.